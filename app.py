@@ -4,36 +4,60 @@ MODEL_NAME = "gpt-4.1"
 # AI-First CRM Copilot - Intelligence-driven approach
 # Let AI understand intent, then execute simple clean functions
 
-from flask import Flask, request, render_template_string, session, redirect, make_response, url_for, send_file
+from flask import Flask, Response, request, render_template, session, redirect, url_for, send_file, g, copy_current_request_context, stream_with_context
+from flask.sessions import SessionInterface
 from flask_session import Session
 import openai
 import json
 import time
 import os
 import logging
-from datetime import timedelta
+from datetime import datetime, timedelta, timezone
 from dotenv import load_dotenv
 from pathlib import Path
 
 # Import our custom modules
 from resume_parser import ResumeParser
-from crm_functions import CRMManager
+from crm_functions import CRMManager, best_contact_match
 from utils import (
     sanitize_input, set_last_contact, get_last_contact, init_session,
-    preprocess_input, extract_contact_name_from_update, is_update_intent,
+    load_history, save_history, push_history, HISTORY_SESSION_KEY,
     create_phone_number_data
 )
 # SECURITY: Import security functions
-from security import rate_limit_login, handle_failed_login, check_honeypot
+from security import rate_limit_login, handle_failed_login, verify_token
 import re
 import uuid
+import hashlib
+import html
+from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice, groupby
+from functools import lru_cache
+
+# orjson is optional - fall back to the stdlib parser if it isn't installed
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
 
 load_dotenv()
 
-# Logging setup
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+# Logging setup - LOG_LEVEL=WARNING in production skips the per-request INFO logging
+logging.basicConfig(level=os.getenv('LOG_LEVEL', 'INFO').upper(), format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Page templates
+try:
+    from templates import (
+        ENHANCED_TEMPLATE, LOGIN_TEMPLATE, DEBUG_TEMPLATE, CONTEXT_TEMPLATE,
+        QUICKADD_TEMPLATE, QUICKEMAIL_TEMPLATE
+    )
+except ImportError as e:
+    logger.error(f"Template import error: {e}")
+    ENHANCED_TEMPLATE = LOGIN_TEMPLATE = DEBUG_TEMPLATE = CONTEXT_TEMPLATE = \
+        QUICKADD_TEMPLATE = QUICKEMAIL_TEMPLATE = "Template error - please check templates.py file"
+
 # Email memory storage - rolling list of last 5 sent emails
 RECENT_EMAILS_FILE = Path(__file__).parent / 'recent_emails.json'
 MAX_RECENT_EMAILS = 5
@@ -44,6 +68,67 @@ AI_CONTEXT_FILE = Path(__file__).parent / 'ai_context.txt'
 # Email templates storage
 EMAIL_TEMPLATES_FILE = Path(__file__).parent / 'email_templates.json'
 
+# Identical prompts resubmitted within this many seconds reuse the last response
+DUPLICATE_SUBMIT_WINDOW = 5
+
+# Session keys cleared by /reset (the legacy list-based history key included)
+RESET_SESSION_KEYS = (HISTORY_SESSION_KEY, 'conversation_history', 'last_contact', 'current_calendar_user')
+
+# Number of most recent history messages sent to the AI with each request
+RECENT_HISTORY_MESSAGES = 6
+
+# Reply when the AI neither answers nor calls a function
+NO_ACTION_MESSAGE = "I understood your request but couldn't determine how to help. Could you rephrase?"
+
+# Upper bound on tool calls run concurrently from one AI response
+MAX_PARALLEL_TOOL_CALLS = 5
+
+# Tools that only read from the CRM and neither use nor change the
+# current contact context - safe to run side by side
+CONTEXT_FREE_TOOLS = frozenset({
+    "list_all_contacts", "search_accounts", "get_account_details",
+    "get_contact_notes", "get_user_tasks", "list_users",
+})
+
+# Shown when a request completes without producing any text
+DEFAULT_OK_MESSAGE = "✅ Operation completed. Please check your CRM."
+
+# Name fields are left alone when merging new data into an existing contact
+NAME_FIELDS = frozenset({'firstName', 'lastName'})
+
+# Display labels for contact fields in update summaries
+CONTACT_FIELD_LABELS = {
+    'emailAddress': '📧 Email',
+    'cCurrentTitle': '💼 Title',
+    'cCurrentCompany': '🏢 Company',
+    'cSkills': '🎯 Skills',
+    'cLinkedInURL': '🔗 LinkedIn',
+}
+
+# (field, prefix) lines shown under each contact / account search result
+_CONTACT_RESULT_FIELDS = (
+    ('emailAddress', '📧'),
+    ('cCurrentTitle', '💼'),
+    ('cCurrentCompany', '🏢'),
+)
+_ACCOUNT_RESULT_FIELDS = (
+    ('emailAddress', '📧'),
+    ('website', '🌐'),
+    ('industry', '🏭'),
+)
+
+def format_search_results(heading: str, records: list, fields: tuple) -> str:
+    """Numbered search result list: name, then one line per non-empty field"""
+    parts = [heading]
+    for i, record in enumerate(records, 1):
+        parts.append(f"{i}. **{record.get('name', 'Unknown')}**\n")
+        for key, prefix in fields:
+            value = record.get(key)
+            if value:
+                parts.append(f"   {prefix} {value}\n")
+        parts.append("\n")
+    return "".join(parts)
+
 def get_recent_emails():
     """Load recent emails from storage"""
     try:
@@ -127,32 +212,9 @@ def delete_email_template(template_id):
 
 
 # AI-FIRST PROCESSING - Simple and Intelligent
-def process_user_request(user_input: str, conversation_history: list) -> str:
-    """
-    Simple flow:
-    1. Ask AI to understand what user wants
-    2. AI returns structured intent
-    3. Execute the intent
-    """
-    try:
-        # Get last contact context for AI
-        last_contact = get_last_contact()
-        context_info = ""
-        if last_contact:
-            context_info = f"\nCurrent contact context: {last_contact['name']} (ID: {last_contact['id']})"
-
-        # Get current date for AI
-        from datetime import datetime, timedelta
-        today = datetime.now()
-        today_str = today.strftime("%Y-%m-%d")
-        day_of_week = today.strftime("%A")
-
-        # Calculate upcoming dates for natural language
-        tomorrow = (today + timedelta(days=1)).strftime("%Y-%m-%d")
-        next_week = (today + timedelta(days=7)).strftime("%Y-%m-%d")
-
-        # Enhanced system prompt - AI does the heavy lifting
-        system_prompt = f"""You are an intelligent CRM assistant. Your job is to understand what the user wants and call the appropriate function.
+# System prompt for the CRM assistant - built once; only the date and contact
+# context are filled in per request (literal braces are doubled for format())
+SYSTEM_PROMPT_TEMPLATE = """You are an intelligent CRM assistant. Your job is to understand what the user wants and call the appropriate function.
 
 CURRENT DATE: {today_str} ({day_of_week})
 - Today: {today_str}
@@ -253,18 +315,58 @@ You: Call list_users
 
 Be smart. Use context. Don't over-complicate. When in doubt, try to help."""
 
-        # Build messages for AI
-        messages = [
-            {"role": "system", "content": system_prompt}
-        ]
-        
-        # Add recent conversation history for context (last 6 messages)
-        messages.extend(conversation_history[-6:])
+# Model decisions are cached for identical conversations (same system prompt,
+# date, contact context, recent history and input). Only plain replies and
+# read-only tool selections are reused - the tools themselves still run, so
+# CRM data is always fresh
+DECISION_CACHE_TTL = 600  # seconds
+DECISION_CACHE_SIZE = 256
+_decision_cache = {}  # messages hash -> (timestamp, tool_calls, content)
+
+def decision_cache_key(messages: list) -> str:
+    """Stable hash of the chat messages sent to the model"""
+    payload = json.dumps(messages, sort_keys=True, ensure_ascii=False)
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+def get_cached_decision(cache_key: str):
+    """Return the (tool_calls, content) cached for cache_key, if still fresh"""
+    cached = _decision_cache.get(cache_key)
+    if cached and time.monotonic() - cached[0] < DECISION_CACHE_TTL:
+        logger.info("♻️ AI DECISION CACHE HIT")
+        return cached[1], cached[2]
+    return None
+
+def remember_decision(cache_key: str, tool_calls: list, content) -> None:
+    """Cache a model decision when replaying it later can't change anything"""
+    if tool_calls:
+        if not all(name in CONTEXT_FREE_TOOLS for name, _ in tool_calls):
+            return
+    elif not content:
+        return
+    if len(_decision_cache) >= DECISION_CACHE_SIZE:
+        # Evict the oldest entry (dicts keep insertion order)
+        _decision_cache.pop(next(iter(_decision_cache)), None)
+    _decision_cache.pop(cache_key, None)
+    _decision_cache[cache_key] = (time.monotonic(), tool_calls, content)
+
+
+def process_user_request(user_input: str, conversation_history) -> str:
+    """
+    Simple flow:
+    1. Ask AI to understand what user wants
+    2. AI returns structured intent
+    3. Execute the intent
+    """
+    try:
+        messages = build_ai_messages(user_input, conversation_history)
         
-        # Add current user input
-        messages.append({"role": "user", "content": user_input})
+        logger.info("🤖 AI PROCESSING: %s...", user_input[:100])
         
-        logger.info(f"🤖 AI PROCESSING: {user_input[:100]}...")
+        cache_key = decision_cache_key(messages)
+        cached = get_cached_decision(cache_key)
+        if cached:
+            tool_calls, content = cached
+            return run_tool_calls(tool_calls, user_input) if tool_calls else content
         
         # Let AI figure out what to do
         try:
@@ -284,376 +386,604 @@ Be smart. Use context. Don't over-complicate. When in doubt, try to help."""
             return f"❌ AI service error: {str(e)}\n\nPlease try again in a moment."
         
         message = response.choices[0].message
+        tool_calls = [(tc.function.name, tc.function.arguments) for tc in message.tool_calls or ()]
+        remember_decision(cache_key, tool_calls, message.content)
         
         # If AI wants to call a function, do it
-        if message.tool_calls:
-            results = []
-            
-            for tool_call in message.tool_calls:
-                function_name = tool_call.function.name
-                function_args = json.loads(tool_call.function.arguments)
-                
-                logger.info(f"📞 AI CALLED: {function_name}")
-                logger.info(f"📋 ARGS: {function_args}")
-                
-                # Execute the function
-                result = handle_function_call(function_name, function_args, user_input)
-                results.append(result)
-            
-            # Return the results
-            return "\n\n".join(results)
+        if tool_calls:
+            return run_tool_calls(tool_calls, user_input)
         
         # If AI just wants to respond with text (for clarifications)
         if message.content:
             return message.content
         
         # Fallback
-        return "I understood your request but couldn't determine how to help. Could you rephrase?"
+        return NO_ACTION_MESSAGE
         
     except Exception as e:
         logger.error(f"❌ Error processing request: {e}")
         return f"⚠️ Something went wrong: {str(e)}\n\nPlease try rephrasing your request."
 
 
-def handle_function_call(function_name: str, arguments: dict, user_input: str = "") -> str:
+def stream_user_request(user_input: str, conversation_history):
     """
-    Simplified function handler - just executes what AI decided
+    Streaming variant of process_user_request - yields text as it becomes
+    available. Plain replies are forwarded token by token; tool calls are
+    assembled from the stream and their results yielded once executed.
     """
     try:
-        logger.info(f"⚡ EXECUTING: {function_name} with {arguments}")
-        
-        if function_name == "search_contacts":
-            criteria = arguments.get("criteria", "")
-            contacts = crm_manager.search_contacts_simple(criteria)
-            
-            if not contacts:
-                return f"❌ No contacts found matching '{criteria}'"
-            
-            # Set context to best match
-            best_match = contacts[0]
-            set_last_contact(best_match['id'], best_match.get('name', 'Unknown'))
-            
-            # Format results
-            result = f"**Found {len(contacts)} contact(s):**\n\n"
-            for i, contact in enumerate(contacts[:5], 1):
-                name = contact.get('name', 'Unknown')
-                result += f"{i}. **{name}**\n"
-                if contact.get('emailAddress'):
-                    result += f"   📧 {contact['emailAddress']}\n"
-                if contact.get('cCurrentTitle'):
-                    result += f"   💼 {contact['cCurrentTitle']}\n"
-                if contact.get('cCurrentCompany'):
-                    result += f"   🏢 {contact['cCurrentCompany']}\n"
-                result += "\n"
-            
-            return result
-            
-        elif function_name == "update_contact":
-            updates = arguments.get("updates", {})
-            contact_name = arguments.get("contact_name")
+        messages = build_ai_messages(user_input, conversation_history)
+        logger.info("🤖 AI STREAMING: %s...", user_input[:100])
+
+        cache_key = decision_cache_key(messages)
+        cached = get_cached_decision(cache_key)
+        if cached:
+            tool_calls, content = cached
+            yield run_tool_calls(tool_calls, user_input) if tool_calls else content
+            return
+
+        try:
+            stream = client.chat.completions.create(
+                model=MODEL_NAME,
+                messages=messages,
+                tools=simple_functions,
+                tool_choice="auto",
+                temperature=0.7,
+                timeout=20,
+                stream=True
+            )
+        except openai.APITimeoutError as e:
+            logger.error(f"❌ AI processing timeout: {e}")
+            yield "❌ Request timed out. Please try again with a simpler request."
+            return
+        except openai.APIError as e:
+            logger.error(f"❌ OpenAI API error: {e}")
+            yield f"❌ AI service error: {str(e)}\n\nPlease try again in a moment."
+            return
+
+        tool_calls = {}  # index -> [name, arguments json]
+        text_parts = []
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta
+            if delta.content:
+                text_parts.append(delta.content)
+                yield delta.content
+            for tc in delta.tool_calls or ():
+                call = tool_calls.setdefault(tc.index, ["", ""])
+                if tc.function and tc.function.name:
+                    call[0] += tc.function.name
+                if tc.function and tc.function.arguments:
+                    call[1] += tc.function.arguments
+
+        tool_calls = [tuple(tool_calls[i]) for i in sorted(tool_calls)]
+        # A reply that mixes text with tool calls isn't replayed from the cache
+        if not (tool_calls and text_parts):
+            remember_decision(cache_key, tool_calls, "".join(text_parts))
+
+        if tool_calls:
+            if text_parts:
+                yield "\n\n"
+            yield run_tool_calls(tool_calls, user_input)
+        elif not text_parts:
+            yield NO_ACTION_MESSAGE
+
+    except Exception as e:
+        logger.error(f"❌ Error streaming request: {e}")
+        yield f"⚠️ Something went wrong: {str(e)}\n\nPlease try rephrasing your request."
+
+
+@lru_cache(maxsize=64)
+def build_system_message(today, context_info: str) -> dict:
+    """Fill in the system prompt for one day and contact context
+
+    Cached - the prompt only changes when the date or the current contact
+    does, so most turns reuse the previous message. Treat it as read-only.
+    """
+    # Calculate upcoming dates for natural language
+    tomorrow = (today + timedelta(days=1)).strftime("%Y-%m-%d")
+    next_week = (today + timedelta(days=7)).strftime("%Y-%m-%d")
+
+    # Enhanced system prompt - AI does the heavy lifting
+    system_prompt = SYSTEM_PROMPT_TEMPLATE.format(
+        today_str=today.strftime("%Y-%m-%d"),
+        day_of_week=today.strftime("%A"),
+        tomorrow=tomorrow,
+        next_week=next_week,
+        context_info=context_info
+    )
+    return {"role": "system", "content": system_prompt}
+
+
+def build_ai_messages(user_input: str, conversation_history) -> list:
+    """Build the chat messages (system prompt, recent history, user input) for the AI"""
+    # Get last contact context for AI
+    last_contact = get_last_contact()
+    context_info = ""
+    if last_contact:
+        context_info = f"\nCurrent contact context: {last_contact['name']} (ID: {last_contact['id']})"
+
+    # Build messages for AI
+    messages = [build_system_message(datetime.now().date(), context_info)]
+    
+    # Add recent conversation history for context (last few messages) -
+    # islice skips the older entries instead of copying the whole history
+    skip = max(0, len(conversation_history) - RECENT_HISTORY_MESSAGES)
+    messages.extend(islice(conversation_history, skip, None))
+    
+    # Add current user input
+    messages.append({"role": "user", "content": user_input})
+    return messages
+
+
+def decode_tool_arguments(function_name: str, arguments: str):
+    """Decode one tool call's JSON arguments, or None if the model sent malformed JSON"""
+    try:
+        return _json_loads(arguments or "{}")
+    except ValueError as e:
+        logger.error("❌ Bad arguments for %s: %s", function_name, e)
+        return None
+
+
+def run_tool_calls(tool_calls: list, user_input: str = "") -> str:
+    """Execute the (function name, JSON arguments) pairs the AI asked for and join their results"""
+    # Decode every call up front - a malformed one only fails itself
+    tool_calls = [(name, decode_tool_arguments(name, arguments)) for name, arguments in tool_calls]
+
+    # Several independent contacts in one input (bulk paste) - create
+    # them concurrently instead of one CRM round trip after another
+    if len(tool_calls) > 1 and all(name == "create_contact" for name, _ in tool_calls):
+        return "\n\n".join(run_tool_calls_concurrently(tool_calls, user_input))
+
+    results = []
+    
+    # Mixed batches keep their order, but a run of consecutive lookups
+    # ("find Acme, list John's notes, then update...") can still go side by side
+    for context_free, group in groupby(tool_calls, key=lambda call: call[0] in CONTEXT_FREE_TOOLS):
+        group = list(group)
+        if context_free and len(group) > 1:
+            results.extend(run_tool_calls_concurrently(group, user_input))
+            continue
+
+        for function_name, function_args in group:
+            logger.info("📞 AI CALLED: %s", function_name)
+            logger.info("📋 ARGS: %s", function_args)
             
-            # If no contact_name provided, use context
-            if not contact_name:
-                last_contact = get_last_contact()
-                if not last_contact:
-                    return "❌ No contact in context. Please search for a contact first."
-                contact_id = last_contact['id']
-                contact_name = last_contact['name']
+            # Execute the function
+            result = handle_function_call(function_name, function_args, user_input)
+            results.append(result)
+    
+    # Return the results
+    return "\n\n".join(results)
+
+
+def run_tool_calls_concurrently(tool_calls: list, user_input: str = "") -> list:
+    """Run independent (function name, arguments) calls concurrently, returning results in order"""
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("📞 AI CALLED: %s (concurrent)", ', '.join(name for name, _ in tool_calls))
+    return map_in_request_context(
+        lambda function_name, arguments: handle_function_call(function_name, arguments, user_input),
+        tool_calls
+    )
+
+
+def map_in_request_context(func, calls: list) -> list:
+    """Run func(*args) for each args tuple in calls on worker threads, returning results in order"""
+    def run_one(*args):
+        result = func(*args)
+        # Each worker gets its own g - hand back the contact it put in context
+        return result, g.get('last_contact')
+
+    # A copied request context can only be pushed by one thread at a time,
+    # so every call gets its own copy
+    with ThreadPoolExecutor(max_workers=min(len(calls), MAX_PARALLEL_TOOL_CALLS)) as pool:
+        futures = [pool.submit(copy_current_request_context(run_one), *args) for args in calls]
+        outcomes = [future.result() for future in futures]
+
+    # Keep the serial behaviour: the last contact touched becomes the context
+    for _, last_contact in reversed(outcomes):
+        if last_contact:
+            set_last_contact(last_contact['id'], last_contact['name'])
+            break
+
+    return [result for result, _ in outcomes]
+
+
+# Tool call handlers - one per function exposed to the AI, all taking
+# (arguments, user_input) and returning the message to show
+
+def _handle_search_contacts(arguments: dict, user_input: str) -> str:
+    criteria = arguments.get("criteria", "")
+    contacts = crm_manager.search_contacts_simple(criteria)
+    
+    if not contacts:
+        return f"❌ No contacts found matching '{criteria}'"
+    
+    # Set context to best match
+    best_match = best_contact_match(contacts, criteria)
+    set_last_contact(best_match['id'], best_match.get('name', 'Unknown'))
+    
+    return format_search_results(f"**Found {len(contacts)} contact(s):**\n\n",
+                                 contacts[:5], _CONTACT_RESULT_FIELDS)
+
+
+def _handle_update_contact(arguments: dict, user_input: str) -> str:
+    updates = arguments.get("updates", {})
+    contact_name = arguments.get("contact_name")
+    
+    # If no contact_name provided, use context
+    if not contact_name:
+        last_contact = get_last_contact()
+        if not last_contact:
+            return "❌ No contact in context. Please search for a contact first."
+        contact_id = last_contact['id']
+        contact_name = last_contact['name']
+    else:
+        # Find the contact
+        contact = crm_manager.find_contact(contact_name)
+        if not contact:
+            return f"❌ Contact '{contact_name}' not found"
+        contact_id = contact['id']
+        contact_name = contact.get('name', contact_name)
+        set_last_contact(contact_id, contact_name)
+    
+    # Handle phone number specially - convert to phoneNumberData
+    if 'phoneNumber' in updates:
+        phone_value = updates['phoneNumber']
+        # Check for comma-separated multiple phones
+        if ',' in str(phone_value):
+            phone_parts = [p.strip() for p in phone_value.split(',') if p.strip()]
+            phone_data = []
+            for i, phone in enumerate(phone_parts):
+                single_data = create_phone_number_data(phone, "Mobile", i == 0)
+                if single_data:
+                    phone_data.extend(single_data)
+            if phone_data:
+                updates['phoneNumberData'] = phone_data
+                del updates['phoneNumber']
             else:
-                # Find the contact
-                contacts = crm_manager.search_contacts_simple(contact_name)
-                if not contacts:
-                    return f"❌ Contact '{contact_name}' not found"
-                contact_id = contacts[0]['id']
-                contact_name = contacts[0].get('name', contact_name)
-                set_last_contact(contact_id, contact_name)
-            
-            # Handle phone number specially - convert to phoneNumberData
-            if 'phoneNumber' in updates:
-                phone_value = updates['phoneNumber']
-                # Check for comma-separated multiple phones
-                if ',' in str(phone_value):
-                    phone_parts = [p.strip() for p in phone_value.split(',') if p.strip()]
-                    phone_data = []
-                    for i, phone in enumerate(phone_parts):
-                        single_data = create_phone_number_data(phone, "Mobile", i == 0)
-                        if single_data:
-                            phone_data.extend(single_data)
-                    if phone_data:
-                        updates['phoneNumberData'] = phone_data
-                        del updates['phoneNumber']
-                    else:
-                        return f"❌ Invalid phone number format: {phone_value}"
-                else:
-                    phone_data = create_phone_number_data(phone_value, "Mobile", True)
-                    if phone_data:
-                        updates['phoneNumberData'] = phone_data
-                        del updates['phoneNumber']
-                    else:
-                        return f"❌ Invalid phone number format: {phone_value}"
-
-            # Handle email address specially - convert to emailAddressData if multiple
-            if 'emailAddress' in updates:
-                email_value = updates['emailAddress']
-                # Check for comma-separated multiple emails
-                if ',' in str(email_value):
-                    email_parts = [e.strip() for e in email_value.split(',') if e.strip() and '@' in e]
-                    if email_parts:
-                        email_data = []
-                        for i, email in enumerate(email_parts):
-                            email_data.append({
-                                'emailAddress': email.lower(),
-                                'primary': i == 0
-                            })
-                        updates['emailAddressData'] = email_data
-                        del updates['emailAddress']
-            
-            # Clean updates
-            clean_updates = {k: v for k, v in updates.items() if v is not None and str(v).strip() != ""}
-            
-            if not clean_updates:
-                return f"No valid updates provided for {contact_name}"
-            
-            # Execute update
-            success, error_msg = crm_manager.update_contact_simple(contact_id, clean_updates)
-            
-            if success:
-                # Show what was updated
-                updated_items = []
-                for key, value in clean_updates.items():
-                    if key == 'phoneNumberData' and isinstance(value, list) and len(value) > 0:
-                        phone_num = value[0].get('phoneNumber', '')
-                        updated_items.append(f"📞 Phone: {phone_num}")
-                    elif key == 'emailAddress':
-                        updated_items.append(f"📧 Email: {value}")
-                    elif key == 'cCurrentTitle':
-                        updated_items.append(f"💼 Title: {value}")
-                    elif key == 'cCurrentCompany':
-                        updated_items.append(f"🏢 Company: {value}")
-                    elif key == 'cLinkedInURL':
-                        updated_items.append(f"🔗 LinkedIn: {value}")
-                    else:
-                        updated_items.append(f"{key}: {value}")
-                
-                result = f"✅ **Updated {contact_name}**"
-                if updated_items:
-                    result += "\n\n" + "\n".join(updated_items)
-                return result
+                return f"❌ Invalid phone number format: {phone_value}"
+        else:
+            phone_data = create_phone_number_data(phone_value, "Mobile", True)
+            if phone_data:
+                updates['phoneNumberData'] = phone_data
+                del updates['phoneNumber']
             else:
-                return f"❌ Failed to update {contact_name}: {error_msg}"
+                return f"❌ Invalid phone number format: {phone_value}"
+
+    # Handle email address specially - convert to emailAddressData if multiple
+    if 'emailAddress' in updates:
+        email_value = updates['emailAddress']
+        # Check for comma-separated multiple emails
+        if ',' in str(email_value):
+            email_parts = [e.strip() for e in email_value.split(',') if e.strip() and '@' in e]
+            if email_parts:
+                email_data = []
+                for i, email in enumerate(email_parts):
+                    email_data.append({
+                        'emailAddress': email.lower(),
+                        'primary': i == 0
+                    })
+                updates['emailAddressData'] = email_data
+                del updates['emailAddress']
+    
+    # Clean updates
+    clean_updates = {k: v for k, v in updates.items() if v is not None and str(v).strip() != ""}
+    
+    if not clean_updates:
+        return f"No valid updates provided for {contact_name}"
+    
+    # Execute update
+    success, error_msg = crm_manager.update_contact_simple(contact_id, clean_updates)
+    
+    if success:
+        # Show what was updated
+        updated_items = []
+        for key, value in clean_updates.items():
+            if key == 'phoneNumberData' and isinstance(value, list) and len(value) > 0:
+                phone_num = value[0].get('phoneNumber', '')
+                updated_items.append(f"📞 Phone: {phone_num}")
+            elif key in CONTACT_FIELD_LABELS:
+                updated_items.append(f"{CONTACT_FIELD_LABELS[key]}: {value}")
+            else:
+                updated_items.append(f"{key}: {value}")
         
-        elif function_name == "create_contact":
-            # Handle phone number conversion
-            if 'phoneNumber' in arguments and not 'phoneNumberData' in arguments:
-                phone_value = arguments['phoneNumber']
-                phone_data = create_phone_number_data(phone_value, "Mobile", True)
-                if phone_data:
-                    arguments['phoneNumberData'] = phone_data
-                del arguments['phoneNumber']
+        result = f"✅ **Updated {contact_name}**"
+        if updated_items:
+            result += "\n\n" + "\n".join(updated_items)
+        return result
+    else:
+        return f"❌ Failed to update {contact_name}: {error_msg}"
+
+
+def _handle_create_contact(arguments: dict, user_input: str) -> str:
+    # Handle phone number conversion
+    if 'phoneNumber' in arguments and not 'phoneNumberData' in arguments:
+        phone_value = arguments['phoneNumber']
+        phone_data = create_phone_number_data(phone_value, "Mobile", True)
+        if phone_data:
+            arguments['phoneNumberData'] = phone_data
+        del arguments['phoneNumber']
+    
+    # Try to create the contact
+    result_msg, contact_id = crm_manager.create_contact(**arguments)
+    
+    # Check if it's a conflict (already exists)
+    if "already exists" in result_msg or contact_id is None:
+        # Contact might already exist - try to find and update instead
+        name = f"{arguments.get('firstName', '')} {arguments.get('lastName', '')}".strip()
+        email = arguments.get('emailAddress')
+        
+        logger.info(f"🔍 Contact creation conflict - searching for existing contact: {name}")
+        
+        # Search by name first
+        existing = crm_manager.search_contacts_simple(name)
+        
+        # If no match by name, try email
+        if not existing and email:
+            existing = crm_manager.search_contacts_simple(email)
+        
+        if existing:
+            # Found existing contact - offer to update
+            contact_id = existing[0]['id']
+            contact_name = existing[0].get('name', name)
+            set_last_contact(contact_id, contact_name)
             
-            # Try to create the contact
-            result_msg, contact_id = crm_manager.create_contact(**arguments)
+            # Prepare update data (exclude name fields to avoid conflicts)
+            # IMPORTANT: Include ALL fields including skills, title, company, etc.
+            update_data = {
+                key: value for key, value in arguments.items()
+                if key not in NAME_FIELDS and value and str(value).strip()
+            }
             
-            # Check if it's a conflict (already exists)
-            if "already exists" in result_msg or contact_id is None:
-                # Contact might already exist - try to find and update instead
-                name = f"{arguments.get('firstName', '')} {arguments.get('lastName', '')}".strip()
-                email = arguments.get('emailAddress')
+            if update_data:
+                logger.info(f"🔄 Updating existing contact {contact_name} with: {list(update_data.keys())}")
                 
-                logger.info(f"🔍 Contact creation conflict - searching for existing contact: {name}")
+                # Update the existing contact
+                success, error_msg = crm_manager.update_contact_simple(contact_id, update_data)
                 
-                # Search by name first
-                existing = crm_manager.search_contacts_simple(name)
-                
-                # If no match by name, try email
-                if not existing and email:
-                    existing = crm_manager.search_contacts_simple(email)
-                
-                if existing:
-                    # Found existing contact - offer to update
-                    contact_id = existing[0]['id']
-                    contact_name = existing[0].get('name', name)
-                    set_last_contact(contact_id, contact_name)
-                    
-                    # Prepare update data (exclude name fields to avoid conflicts)
-                    # IMPORTANT: Include ALL fields including skills, title, company, etc.
-                    update_data = {}
-                    for key, value in arguments.items():
-                        if key not in ['firstName', 'lastName'] and value and str(value).strip():
-                            update_data[key] = value
-                            logger.info(f"📝 Will update {key}: {value}")
+                if success:
+                    # Get updated details to show what changed
+                    details = crm_manager.get_contact_details(contact_id)
                     
-                    if update_data:
-                        logger.info(f"🔄 Updating existing contact {contact_name} with: {list(update_data.keys())}")
-                        
-                        # Update the existing contact
-                        success, error_msg = crm_manager.update_contact_simple(contact_id, update_data)
-                        
-                        if success:
-                            # Get updated details to show what changed
-                            details = crm_manager.get_contact_details(contact_id)
-                            
-                            # Build list of what was updated
-                            updated_fields = []
-                            for key, value in update_data.items():
-                                if key == 'phoneNumberData' and isinstance(value, list) and len(value) > 0:
-                                    updated_fields.append(f"📞 Phone: {value[0].get('phoneNumber', '')}")
-                                elif key == 'emailAddress':
-                                    updated_fields.append(f"📧 Email: {value}")
-                                elif key == 'cCurrentTitle':
-                                    updated_fields.append(f"💼 Title: {value}")
-                                elif key == 'cCurrentCompany':
-                                    updated_fields.append(f"🏢 Company: {value}")
-                                elif key == 'cSkills':
-                                    updated_fields.append(f"🎯 Skills: {value}")
-                                elif key == 'cLinkedInURL':
-                                    updated_fields.append(f"🔗 LinkedIn: {value}")
-                                else:
-                                    updated_fields.append(f"• {key}: {value}")
-                            
-                            result = f"ℹ️ **Contact already exists: {contact_name}**\n\n✅ **Updated with new information:**\n"
-                            result += "\n".join(updated_fields)
-                            result += f"\n\n**Full details:**\n{details}"
-                            return result
+                    # Build list of what was updated
+                    updated_fields = []
+                    for key, value in update_data.items():
+                        if key == 'phoneNumberData' and isinstance(value, list) and len(value) > 0:
+                            updated_fields.append(f"📞 Phone: {value[0].get('phoneNumber', '')}")
+                        elif key in CONTACT_FIELD_LABELS:
+                            updated_fields.append(f"{CONTACT_FIELD_LABELS[key]}: {value}")
                         else:
-                            details = crm_manager.get_contact_details(contact_id)
-                            return f"ℹ️ **Contact already exists: {contact_name}**\n\n⚠️ Update failed: {error_msg}\n\n**Current details:**\n{details}"
-                    else:
-                        details = crm_manager.get_contact_details(contact_id)
-                        return f"ℹ️ **Contact already exists: {contact_name}**\n\nNo new information to add.\n\n**Current details:**\n{details}"
+                            updated_fields.append(f"• {key}: {value}")
+                    
+                    result = f"ℹ️ **Contact already exists: {contact_name}**\n\n✅ **Updated with new information:**\n"
+                    result += "\n".join(updated_fields)
+                    result += f"\n\n**Full details:**\n{details}"
+                    return result
                 else:
-                    # Couldn't find existing contact, return original error
-                    return result_msg
+                    details = crm_manager.get_contact_details(contact_id)
+                    return f"ℹ️ **Contact already exists: {contact_name}**\n\n⚠️ Update failed: {error_msg}\n\n**Current details:**\n{details}"
             else:
-                # Success - set context
-                if contact_id:
-                    name = f"{arguments.get('firstName', '')} {arguments.get('lastName', '')}".strip()
-                    set_last_contact(contact_id, name)
-                return result_msg
-            
-        elif function_name == "get_contact_details":
-            contact_name = arguments.get("contact_name")
-            contacts = crm_manager.search_contacts_simple(contact_name)
-            if not contacts:
-                return f"❌ Contact '{contact_name}' not found"
-            contact_id = contacts[0]['id']
-            set_last_contact(contact_id, contacts[0].get('name', contact_name))
-            return crm_manager.get_contact_details(contact_id)
-            
-        elif function_name == "add_note":
-            note_content = arguments.get("note_content")
-            contact_name = arguments.get("contact_name")
-            
-            # Use context if no name provided
-            if not contact_name:
-                last_contact = get_last_contact()
-                if not last_contact:
-                    return "❌ No contact in context"
-                contact_id = last_contact['id']
-                contact_name = last_contact['name']
+                details = crm_manager.get_contact_details(contact_id)
+                return f"ℹ️ **Contact already exists: {contact_name}**\n\nNo new information to add.\n\n**Current details:**\n{details}"
+        else:
+            # Couldn't find existing contact, return original error
+            return result_msg
+    else:
+        # Success - set context
+        if contact_id:
+            name = f"{arguments.get('firstName', '')} {arguments.get('lastName', '')}".strip()
+            set_last_contact(contact_id, name)
+        return result_msg
+
+
+def _handle_get_contact_details(arguments: dict, user_input: str) -> str:
+    contact_name = arguments.get("contact_name")
+    contact = crm_manager.find_contact(contact_name)
+    if not contact:
+        return f"❌ Contact '{contact_name}' not found"
+    contact_id = contact['id']
+    set_last_contact(contact_id, contact.get('name', contact_name))
+    return crm_manager.get_contact_details(contact_id)
+
+
+def _handle_add_note(arguments: dict, user_input: str) -> str:
+    note_content = arguments.get("note_content")
+    contact_name = arguments.get("contact_name")
+    
+    # Use context if no name provided
+    if not contact_name:
+        last_contact = get_last_contact()
+        if not last_contact:
+            return "❌ No contact in context"
+        contact_id = last_contact['id']
+        contact_name = last_contact['name']
+    else:
+        contact = crm_manager.find_contact(contact_name)
+        if not contact:
+            return f"❌ Contact '{contact_name}' not found"
+        contact_id = contact['id']
+        contact_name = contact.get('name', contact_name)
+        set_last_contact(contact_id, contact_name)
+    
+    result = crm_manager.add_note(contact_id, note_content)
+    return result.replace("contact", f"**{contact_name}**")
+
+
+def _handle_get_contact_notes(arguments: dict, user_input: str) -> str:
+    contact_name = arguments.get("contact_name")
+    contact = crm_manager.find_contact(contact_name)
+    if not contact:
+        return f"❌ Contact '{contact_name}' not found"
+    return crm_manager.get_contact_notes(contact['id'])
+
+
+def _handle_parse_resume(arguments: dict, user_input: str) -> str:
+    resume_text = arguments.get("resume_text")
+    resume_file = arguments.get("resume_file")  # File object if available
+
+    # Use the same extract_resume_info method as the careers page
+    logger.info("📄 Parsing resume with AI (using extract_resume_info)")
+
+    try:
+        # Extract structured data from resume text (pass filename for fallback extraction)
+        filename = resume_file.filename if resume_file and hasattr(resume_file, 'filename') else None
+        parsed_data = resume_parser.extract_resume_info(resume_text, filename=filename)
+
+        if not parsed_data or not parsed_data.get('firstName') or not parsed_data.get('lastName'):
+            logger.error("Failed to extract required fields from resume")
+            return "❌ Could not extract contact information from resume. Please ensure the resume contains a name."
+
+        logger.info("📋 Extracted contact data: %s", parsed_data)
+
+        # Log filename vs extracted name for debugging
+        extracted_name = f"{parsed_data.get('firstName', '')} {parsed_data.get('lastName', '')}".strip()
+        logger.info("🔍 UPLOADED FILE: %s", resume_file.filename if resume_file else 'N/A')
+        logger.info("🔍 EXTRACTED NAME: %s", extracted_name)
+        if resume_file and resume_file.filename:
+            # Check if filename suggests a different person
+            filename_lower = resume_file.filename.lower()
+            if extracted_name.lower() not in filename_lower:
+                logger.warning("⚠️ MISMATCH: Filename '%s' doesn't match extracted name '%s'", resume_file.filename, extracted_name)
+
+        # Set candidate flag to true (this is a resume upload, so they are a candidate)
+        parsed_data['cIsCandidate'] = True
+        logger.info("✅ Set cIsCandidate=True")
+
+        # CRITICAL: Search for existing contact FIRST before trying to create
+        # This prevents creating duplicate/wrong contacts
+        name = f"{parsed_data.get('firstName', '')} {parsed_data.get('lastName', '')}".strip()
+        email = parsed_data.get('emailAddress')
+
+        logger.info("🔍 Searching for existing contact: %s", name)
+        existing_contact = crm_manager.search_contacts_simple(name)
+
+        # If not found by name, try email
+        if not existing_contact and email and email != 'Unknown':
+            logger.info("🔍 Searching by email: %s", email)
+            existing_contact = crm_manager.search_contacts_simple(email)
+
+        # If still not found and we have a filename, try searching by filename
+        if not existing_contact and filename:
+            # Try to extract name from filename and search
+            filename_name_parts = resume_parser.extract_name_from_filename(filename)
+            if filename_name_parts:
+                filename_search_name = f"{filename_name_parts[0]} {filename_name_parts[1]}"
+                logger.info("🔍 Searching by filename-derived name: %s", filename_search_name)
+                existing_contact = crm_manager.search_contacts_simple(filename_search_name)
+
+        # If we found an existing contact, update it instead of creating
+        if existing_contact:
+            contact_id = existing_contact[0]['id']
+            contact_name = existing_contact[0].get('name', name)
+            logger.info("✅ Found existing contact: %s (ID: %s)", contact_name, contact_id)
+            logger.info("🔄 Will update instead of create")
+            set_last_contact(contact_id, contact_name)
+
+            # Prepare update data (exclude firstName, lastName to avoid changing identity)
+            update_data = {
+                key: value for key, value in parsed_data.items()
+                if key not in NAME_FIELDS
+                and (isinstance(value, bool) or (value and str(value).strip() and str(value) != 'Unknown'))
+            }
+
+            # Handle phone number conversion for update
+            if 'phoneNumber' in update_data and 'phoneNumberData' not in update_data:
+                phone_value = update_data['phoneNumber']
+                phone_data = create_phone_number_data(phone_value, "Mobile", True)
+                if phone_data:
+                    update_data['phoneNumberData'] = phone_data
+                del update_data['phoneNumber']
+
+            # Execute update
+            success, error_msg = crm_manager.update_contact_simple(contact_id, update_data)
+
+            if success:
+                # Upload resume file
+                file_upload_msg = ""
+                if resume_file:
+                    logger.info("📎 Uploading resume file: %s", resume_file.filename)
+                    upload_success, upload_result = crm_manager.upload_attachment(
+                        'Contact', contact_id, resume_file, resume_file.filename, 'cResume'
+                    )
+                    if upload_success:
+                        file_upload_msg = f"\n📎 Resume file uploaded: {resume_file.filename}"
+                    else:
+                        file_upload_msg = f"\n⚠️ Resume file upload failed: {upload_result}"
+
+                # Build update summary
+                updated_fields = []
+                for key, value in update_data.items():
+                    if key == 'phoneNumberData' and isinstance(value, list) and len(value) > 0:
+                        updated_fields.append(f"📞 Phone: {value[0].get('phoneNumber', '')}")
+                    elif key in CONTACT_FIELD_LABELS:
+                        updated_fields.append(f"{CONTACT_FIELD_LABELS[key]}: {value}")
+                    elif key == 'cIsCandidate' and value:
+                        updated_fields.append(f"✅ Marked as Candidate")
+
+                result = f"ℹ️ **Contact already exists: {contact_name}**\n\n✅ **Updated with new information:**\n"
+                result += "\n".join(updated_fields)
+                result += file_upload_msg
+
+                # Add warning if extracted name doesn't match contact name
+                if name.lower() != contact_name.lower():
+                    result += f"\n\n⚠️ **Note:** Resume extracted name '{name}', but updated existing contact '{contact_name}'"
+
+                return result
             else:
-                contacts = crm_manager.search_contacts_simple(contact_name)
-                if not contacts:
-                    return f"❌ Contact '{contact_name}' not found"
-                contact_id = contacts[0]['id']
-                contact_name = contacts[0].get('name', contact_name)
-                set_last_contact(contact_id, contact_name)
-            
-            result = crm_manager.add_note(contact_id, note_content)
-            return result.replace("contact", f"**{contact_name}**")
-            
-        elif function_name == "get_contact_notes":
-            contact_name = arguments.get("contact_name")
-            contacts = crm_manager.search_contacts_simple(contact_name)
-            if not contacts:
-                return f"❌ Contact '{contact_name}' not found"
-            return crm_manager.get_contact_notes(contacts[0]['id'])
-            
-        elif function_name == "parse_resume":
-            resume_text = arguments.get("resume_text")
-            resume_file = arguments.get("resume_file")  # File object if available
+                return f"ℹ️ **Contact already exists: {contact_name}**\n\n⚠️ Update failed: {error_msg}"
 
-            # Use the same extract_resume_info method as the careers page
-            logger.info("📄 Parsing resume with AI (using extract_resume_info)")
+        # No existing contact found - proceed with creation
+        logger.info("📝 No existing contact found, will create new contact")
 
-            try:
-                # Extract structured data from resume text (pass filename for fallback extraction)
-                filename = resume_file.filename if resume_file and hasattr(resume_file, 'filename') else None
-                parsed_data = resume_parser.extract_resume_info(resume_text, filename=filename)
+        # Handle phone number conversion
+        if 'phoneNumber' in parsed_data and not 'phoneNumberData' in parsed_data:
+            phone_value = parsed_data['phoneNumber']
+            phone_data = create_phone_number_data(phone_value, "Mobile", True)
+            if phone_data:
+                parsed_data['phoneNumberData'] = phone_data
+            del parsed_data['phoneNumber']
 
-                if not parsed_data or not parsed_data.get('firstName') or not parsed_data.get('lastName'):
-                    logger.error("Failed to extract required fields from resume")
-                    return "❌ Could not extract contact information from resume. Please ensure the resume contains a name."
+        # Try to create the contact
+        result_msg, contact_id = crm_manager.create_contact(**parsed_data)
 
-                logger.info(f"📋 Extracted contact data: {parsed_data}")
+        # Check if contact already exists - if so, search and update
+        if "already exists" in result_msg or contact_id is None:
+            name = f"{parsed_data.get('firstName', '')} {parsed_data.get('lastName', '')}".strip()
+            email = parsed_data.get('emailAddress')
 
-                # Log filename vs extracted name for debugging
-                extracted_name = f"{parsed_data.get('firstName', '')} {parsed_data.get('lastName', '')}".strip()
-                logger.info(f"🔍 UPLOADED FILE: {resume_file.filename if resume_file else 'N/A'}")
-                logger.info(f"🔍 EXTRACTED NAME: {extracted_name}")
-                if resume_file and resume_file.filename:
-                    # Check if filename suggests a different person
-                    filename_lower = resume_file.filename.lower()
-                    if extracted_name.lower() not in filename_lower:
-                        logger.warning(f"⚠️ MISMATCH: Filename '{resume_file.filename}' doesn't match extracted name '{extracted_name}'")
+            logger.info("🔍 Contact creation conflict - searching for existing contact: %s", name)
 
-                # Set candidate flag to true (this is a resume upload, so they are a candidate)
-                parsed_data['cIsCandidate'] = True
-                logger.info("✅ Set cIsCandidate=True")
+            # Search by name first
+            existing = crm_manager.search_contacts_simple(name)
 
-                # CRITICAL: Search for existing contact FIRST before trying to create
-                # This prevents creating duplicate/wrong contacts
-                name = f"{parsed_data.get('firstName', '')} {parsed_data.get('lastName', '')}".strip()
-                email = parsed_data.get('emailAddress')
-
-                logger.info(f"🔍 Searching for existing contact: {name}")
-                existing_contact = crm_manager.search_contacts_simple(name)
-
-                # If not found by name, try email
-                if not existing_contact and email and email != 'Unknown':
-                    logger.info(f"🔍 Searching by email: {email}")
-                    existing_contact = crm_manager.search_contacts_simple(email)
-
-                # If still not found and we have a filename, try searching by filename
-                if not existing_contact and filename:
-                    # Try to extract name from filename and search
-                    filename_name_parts = resume_parser.extract_name_from_filename(filename)
-                    if filename_name_parts:
-                        filename_search_name = f"{filename_name_parts[0]} {filename_name_parts[1]}"
-                        logger.info(f"🔍 Searching by filename-derived name: {filename_search_name}")
-                        existing_contact = crm_manager.search_contacts_simple(filename_search_name)
-
-                # If we found an existing contact, update it instead of creating
-                if existing_contact:
-                    contact_id = existing_contact[0]['id']
-                    contact_name = existing_contact[0].get('name', name)
-                    logger.info(f"✅ Found existing contact: {contact_name} (ID: {contact_id})")
-                    logger.info(f"🔄 Will update instead of create")
-                    set_last_contact(contact_id, contact_name)
-
-                    # Prepare update data (exclude firstName, lastName to avoid changing identity)
-                    update_data = {}
-                    for key, value in parsed_data.items():
-                        if key not in ['firstName', 'lastName']:
-                            if isinstance(value, bool) or (value and str(value).strip() and str(value) != 'Unknown'):
-                                update_data[key] = value
-
-                    # Handle phone number conversion for update
-                    if 'phoneNumber' in update_data and 'phoneNumberData' not in update_data:
-                        phone_value = update_data['phoneNumber']
-                        phone_data = create_phone_number_data(phone_value, "Mobile", True)
-                        if phone_data:
-                            update_data['phoneNumberData'] = phone_data
-                        del update_data['phoneNumber']
+            # If no match by name, try email
+            if not existing and email:
+                existing = crm_manager.search_contacts_simple(email)
+
+            if existing:
+                # Found existing contact - update with new data
+                contact_id = existing[0]['id']
+                contact_name = existing[0].get('name', name)
+                set_last_contact(contact_id, contact_name)
+
+                # Prepare update data (exclude name fields, but include cIsCandidate)
+                # Include boolean values and non-empty string values
+                update_data = {
+                    key: value for key, value in parsed_data.items()
+                    if key not in NAME_FIELDS and (isinstance(value, bool) or (value and str(value).strip()))
+                }
 
-                    # Execute update
+                if update_data:
+                    logger.info("🔄 Updating existing contact %s with: %s", contact_name, list(update_data.keys()))
                     success, error_msg = crm_manager.update_contact_simple(contact_id, update_data)
 
                     if success:
-                        # Upload resume file
+                        # Upload resume file if available
                         file_upload_msg = ""
                         if resume_file:
-                            logger.info(f"📎 Uploading resume file: {resume_file.filename}")
+                            logger.info("📎 Uploading resume file: %s", resume_file.filename)
                             upload_success, upload_result = crm_manager.upload_attachment(
                                 'Contact', contact_id, resume_file, resume_file.filename, 'cResume'
                             )
@@ -662,279 +992,217 @@ def handle_function_call(function_name: str, arguments: dict, user_input: str =
                             else:
                                 file_upload_msg = f"\n⚠️ Resume file upload failed: {upload_result}"
 
-                        # Build update summary
+                        # Build list of updated fields
                         updated_fields = []
                         for key, value in update_data.items():
                             if key == 'phoneNumberData' and isinstance(value, list) and len(value) > 0:
                                 updated_fields.append(f"📞 Phone: {value[0].get('phoneNumber', '')}")
-                            elif key == 'emailAddress':
-                                updated_fields.append(f"📧 Email: {value}")
-                            elif key == 'cCurrentTitle':
-                                updated_fields.append(f"💼 Title: {value}")
-                            elif key == 'cCurrentCompany':
-                                updated_fields.append(f"🏢 Company: {value}")
-                            elif key == 'cSkills':
-                                updated_fields.append(f"🎯 Skills: {value}")
-                            elif key == 'cLinkedInURL':
-                                updated_fields.append(f"🔗 LinkedIn: {value}")
+                            elif key in CONTACT_FIELD_LABELS:
+                                updated_fields.append(f"{CONTACT_FIELD_LABELS[key]}: {value}")
                             elif key == 'cIsCandidate' and value:
                                 updated_fields.append(f"✅ Marked as Candidate")
+                            else:
+                                updated_fields.append(f"• {key}: {value}")
 
                         result = f"ℹ️ **Contact already exists: {contact_name}**\n\n✅ **Updated with new information:**\n"
                         result += "\n".join(updated_fields)
                         result += file_upload_msg
 
-                        # Add warning if extracted name doesn't match contact name
-                        if name.lower() != contact_name.lower():
-                            result += f"\n\n⚠️ **Note:** Resume extracted name '{name}', but updated existing contact '{contact_name}'"
+                        # Add warning if filename doesn't match extracted name
+                        if resume_file and resume_file.filename:
+                            filename_lower = resume_file.filename.lower()
+                            name_lower = contact_name.lower()
+                            if name_lower not in filename_lower:
+                                result += f"\n\n⚠️ **Note:** The uploaded file is named '{resume_file.filename}', but the resume contains information for '{contact_name}'. Please verify this is the correct file."
 
                         return result
                     else:
                         return f"ℹ️ **Contact already exists: {contact_name}**\n\n⚠️ Update failed: {error_msg}"
-
-                # No existing contact found - proceed with creation
-                logger.info(f"📝 No existing contact found, will create new contact")
-
-                # Handle phone number conversion
-                if 'phoneNumber' in parsed_data and not 'phoneNumberData' in parsed_data:
-                    phone_value = parsed_data['phoneNumber']
-                    phone_data = create_phone_number_data(phone_value, "Mobile", True)
-                    if phone_data:
-                        parsed_data['phoneNumberData'] = phone_data
-                    del parsed_data['phoneNumber']
-
-                # Try to create the contact
-                result_msg, contact_id = crm_manager.create_contact(**parsed_data)
-
-                # Check if contact already exists - if so, search and update
-                if "already exists" in result_msg or contact_id is None:
-                    name = f"{parsed_data.get('firstName', '')} {parsed_data.get('lastName', '')}".strip()
-                    email = parsed_data.get('emailAddress')
-
-                    logger.info(f"🔍 Contact creation conflict - searching for existing contact: {name}")
-
-                    # Search by name first
-                    existing = crm_manager.search_contacts_simple(name)
-
-                    # If no match by name, try email
-                    if not existing and email:
-                        existing = crm_manager.search_contacts_simple(email)
-
-                    if existing:
-                        # Found existing contact - update with new data
-                        contact_id = existing[0]['id']
-                        contact_name = existing[0].get('name', name)
-                        set_last_contact(contact_id, contact_name)
-
-                        # Prepare update data (exclude name fields, but include cIsCandidate)
-                        update_data = {}
-                        for key, value in parsed_data.items():
-                            if key not in ['firstName', 'lastName']:
-                                # Include boolean values and non-empty string values
-                                if isinstance(value, bool) or (value and str(value).strip()):
-                                    update_data[key] = value
-                                    logger.info(f"📝 Will update {key}: {value}")
-
-                        if update_data:
-                            logger.info(f"🔄 Updating existing contact {contact_name} with: {list(update_data.keys())}")
-                            success, error_msg = crm_manager.update_contact_simple(contact_id, update_data)
-
-                            if success:
-                                # Upload resume file if available
-                                file_upload_msg = ""
-                                if resume_file:
-                                    logger.info(f"📎 Uploading resume file: {resume_file.filename}")
-                                    upload_success, upload_result = crm_manager.upload_attachment(
-                                        'Contact', contact_id, resume_file, resume_file.filename, 'cResume'
-                                    )
-                                    if upload_success:
-                                        file_upload_msg = f"\n📎 Resume file uploaded: {resume_file.filename}"
-                                    else:
-                                        file_upload_msg = f"\n⚠️ Resume file upload failed: {upload_result}"
-
-                                # Build list of updated fields
-                                updated_fields = []
-                                for key, value in update_data.items():
-                                    if key == 'phoneNumberData' and isinstance(value, list) and len(value) > 0:
-                                        updated_fields.append(f"📞 Phone: {value[0].get('phoneNumber', '')}")
-                                    elif key == 'emailAddress':
-                                        updated_fields.append(f"📧 Email: {value}")
-                                    elif key == 'cCurrentTitle':
-                                        updated_fields.append(f"💼 Title: {value}")
-                                    elif key == 'cCurrentCompany':
-                                        updated_fields.append(f"🏢 Company: {value}")
-                                    elif key == 'cSkills':
-                                        updated_fields.append(f"🎯 Skills: {value}")
-                                    elif key == 'cLinkedInURL':
-                                        updated_fields.append(f"🔗 LinkedIn: {value}")
-                                    elif key == 'cIsCandidate' and value:
-                                        updated_fields.append(f"✅ Marked as Candidate")
-                                    else:
-                                        updated_fields.append(f"• {key}: {value}")
-
-                                result = f"ℹ️ **Contact already exists: {contact_name}**\n\n✅ **Updated with new information:**\n"
-                                result += "\n".join(updated_fields)
-                                result += file_upload_msg
-
-                                # Add warning if filename doesn't match extracted name
-                                if resume_file and resume_file.filename:
-                                    filename_lower = resume_file.filename.lower()
-                                    name_lower = contact_name.lower()
-                                    if name_lower not in filename_lower:
-                                        result += f"\n\n⚠️ **Note:** The uploaded file is named '{resume_file.filename}', but the resume contains information for '{contact_name}'. Please verify this is the correct file."
-
-                                return result
-                            else:
-                                return f"ℹ️ **Contact already exists: {contact_name}**\n\n⚠️ Update failed: {error_msg}"
-                        else:
-                            return f"ℹ️ **Contact already exists: {contact_name}**\n\nNo new information to add."
-                    else:
-                        return result_msg
                 else:
-                    # Success - new contact created
-                    if contact_id:
-                        name = f"{parsed_data.get('firstName', '')} {parsed_data.get('lastName', '')}".strip()
-                        set_last_contact(contact_id, name)
-
-                        # Build a detailed summary of what was created
-                        created_fields = []
-                        if parsed_data.get('emailAddress'):
-                            created_fields.append(f"📧 Email: {parsed_data['emailAddress']}")
-                        if parsed_data.get('phoneNumberData') and isinstance(parsed_data['phoneNumberData'], list) and len(parsed_data['phoneNumberData']) > 0:
-                            phone_num = parsed_data['phoneNumberData'][0].get('phoneNumber', '')
-                            if phone_num:
-                                created_fields.append(f"📞 Phone: {phone_num}")
-                        if parsed_data.get('cCurrentTitle'):
-                            created_fields.append(f"💼 Title: {parsed_data['cCurrentTitle']}")
-                        if parsed_data.get('cCurrentCompany'):
-                            created_fields.append(f"🏢 Company: {parsed_data['cCurrentCompany']}")
-                        if parsed_data.get('cSkills'):
-                            created_fields.append(f"🎯 Skills: {parsed_data['cSkills']}")
-                        if parsed_data.get('cLinkedInURL'):
-                            created_fields.append(f"🔗 LinkedIn: {parsed_data['cLinkedInURL']}")
-                        if parsed_data.get('cIsCandidate'):
-                            created_fields.append(f"✅ Marked as Candidate")
+                    return f"ℹ️ **Contact already exists: {contact_name}**\n\nNo new information to add."
+            else:
+                return result_msg
+        else:
+            # Success - new contact created
+            if contact_id:
+                name = f"{parsed_data.get('firstName', '')} {parsed_data.get('lastName', '')}".strip()
+                set_last_contact(contact_id, name)
+
+                # Build a detailed summary of what was created
+                created_fields = []
+                if parsed_data.get('emailAddress'):
+                    created_fields.append(f"📧 Email: {parsed_data['emailAddress']}")
+                if parsed_data.get('phoneNumberData') and isinstance(parsed_data['phoneNumberData'], list) and len(parsed_data['phoneNumberData']) > 0:
+                    phone_num = parsed_data['phoneNumberData'][0].get('phoneNumber', '')
+                    if phone_num:
+                        created_fields.append(f"📞 Phone: {phone_num}")
+                if parsed_data.get('cCurrentTitle'):
+                    created_fields.append(f"💼 Title: {parsed_data['cCurrentTitle']}")
+                if parsed_data.get('cCurrentCompany'):
+                    created_fields.append(f"🏢 Company: {parsed_data['cCurrentCompany']}")
+                if parsed_data.get('cSkills'):
+                    created_fields.append(f"🎯 Skills: {parsed_data['cSkills']}")
+                if parsed_data.get('cLinkedInURL'):
+                    created_fields.append(f"🔗 LinkedIn: {parsed_data['cLinkedInURL']}")
+                if parsed_data.get('cIsCandidate'):
+                    created_fields.append(f"✅ Marked as Candidate")
+
+                # Upload resume file if available
+                file_upload_msg = ""
+                if resume_file:
+                    logger.info("📎 Uploading resume file: %s", resume_file.filename)
+                    upload_success, upload_result = crm_manager.upload_attachment(
+                        'Contact', contact_id, resume_file, resume_file.filename, 'cResume'
+                    )
+                    if upload_success:
+                        file_upload_msg = f"\n📎 Resume file uploaded: {resume_file.filename}"
+                        logger.info("✅ Resume upload successful: %s", upload_result)
+                    else:
+                        file_upload_msg = f"\n⚠️ Resume file upload failed: {upload_result}"
+                        logger.error("❌ Resume upload failed: %s", upload_result)
 
-                        # Upload resume file if available
-                        file_upload_msg = ""
-                        if resume_file:
-                            logger.info(f"📎 Uploading resume file: {resume_file.filename}")
-                            upload_success, upload_result = crm_manager.upload_attachment(
-                                'Contact', contact_id, resume_file, resume_file.filename, 'cResume'
-                            )
-                            if upload_success:
-                                file_upload_msg = f"\n📎 Resume file uploaded: {resume_file.filename}"
-                                logger.info(f"✅ Resume upload successful: {upload_result}")
-                            else:
-                                file_upload_msg = f"\n⚠️ Resume file upload failed: {upload_result}"
-                                logger.error(f"❌ Resume upload failed: {upload_result}")
+                result = f"✅ **Created new contact: {name}**\n\n**Extracted information:**\n"
+                result += "\n".join(created_fields)
+                result += file_upload_msg
 
-                        result = f"✅ **Created new contact: {name}**\n\n**Extracted information:**\n"
-                        result += "\n".join(created_fields)
-                        result += file_upload_msg
+                # Add warning if filename doesn't match extracted name
+                if resume_file and resume_file.filename:
+                    filename_lower = resume_file.filename.lower()
+                    name_lower = name.lower()
+                    if name_lower not in filename_lower:
+                        result += f"\n\n⚠️ **Note:** The uploaded file is named '{resume_file.filename}', but the resume contains information for '{name}'. Please verify this is the correct file."
 
-                        # Add warning if filename doesn't match extracted name
-                        if resume_file and resume_file.filename:
-                            filename_lower = resume_file.filename.lower()
-                            name_lower = name.lower()
-                            if name_lower not in filename_lower:
-                                result += f"\n\n⚠️ **Note:** The uploaded file is named '{resume_file.filename}', but the resume contains information for '{name}'. Please verify this is the correct file."
+                return result
+            return result_msg
 
-                        return result
-                    return result_msg
+    except Exception as e:
+        logger.error("❌ Unexpected resume parsing error: %s", e, exc_info=True)
+        return f"❌ Error parsing resume: {str(e)}\n\nPlease try again or contact support if the issue persists."
 
-            except Exception as e:
-                logger.error(f"❌ Unexpected resume parsing error: {e}", exc_info=True)
-                return f"❌ Error parsing resume: {str(e)}\n\nPlease try again or contact support if the issue persists."
-            
-        elif function_name == "list_all_contacts":
-            return crm_manager.list_all_contacts(arguments.get("limit", 20))
-
-        elif function_name == "search_accounts":
-            criteria = arguments.get("criteria", "")
-            accounts = crm_manager.search_accounts(criteria)
-
-            if not accounts:
-                return f"❌ No accounts found matching '{criteria}'"
-
-            result = f"**Found {len(accounts)} account(s):**\n\n"
-            for i, account in enumerate(accounts[:10], 1):
-                name = account.get('name', 'Unknown')
-                result += f"{i}. **{name}**\n"
-                if account.get('emailAddress'):
-                    result += f"   📧 {account['emailAddress']}\n"
-                if account.get('website'):
-                    result += f"   🌐 {account['website']}\n"
-                if account.get('industry'):
-                    result += f"   🏭 {account['industry']}\n"
-                result += "\n"
-
-            return result
-
-        elif function_name == "create_account":
-            result_msg, account_id = crm_manager.create_account(**arguments)
-            return result_msg
 
-        elif function_name == "get_account_details":
-            account_name = arguments.get("account_name", "")
-            accounts = crm_manager.search_accounts(account_name)
-            if not accounts:
-                return f"❌ Account '{account_name}' not found"
-            account_id = accounts[0]['id']
-            return crm_manager.get_account_details(account_id)
-
-        elif function_name == "link_contact_to_account":
-            contact_name = arguments.get("contact_name", "")
-            account_name = arguments.get("account_name", "")
-            primary = arguments.get("primary", True)
-            return crm_manager.link_contact_to_account(contact_name, account_name, primary)
-
-        # TASK AND REMINDER FUNCTIONS
-        elif function_name == "create_task":
-            name = arguments.get("name", "")
-            assigned_to = arguments.get("assigned_to")
-            due_date = arguments.get("due_date")
-            description = arguments.get("description")
-            priority = arguments.get("priority", "Normal")
-            related_contact = arguments.get("related_contact")
-
-            return crm_manager.create_task(
-                name=name,
-                assigned_to=assigned_to,
-                due_date=due_date,
-                description=description,
-                priority=priority,
-                related_contact=related_contact
-            )
+def _handle_list_all_contacts(arguments: dict, user_input: str) -> str:
+    return crm_manager.list_all_contacts(arguments.get("limit", 20))
 
-        elif function_name == "create_reminder":
-            reminder_text = arguments.get("reminder_text", "")
-            for_user = arguments.get("for_user")
-            due_date = arguments.get("due_date")
-            related_contact = arguments.get("related_contact")
-
-            return crm_manager.create_reminder(
-                reminder_text=reminder_text,
-                for_user=for_user,
-                due_date=due_date,
-                related_contact=related_contact
-            )
 
-        elif function_name == "get_user_tasks":
-            user_name = arguments.get("user_name")
-            status_filter = arguments.get("status_filter", "open")
-            return crm_manager.get_user_tasks(user_name=user_name, status_filter=status_filter)
+def _handle_search_accounts(arguments: dict, user_input: str) -> str:
+    criteria = arguments.get("criteria", "")
+    accounts = crm_manager.search_accounts(criteria)
 
-        elif function_name == "complete_task":
-            task_name = arguments.get("task_name", "")
-            user_name = arguments.get("user_name")
-            return crm_manager.update_task_status(task_name, "Completed", user_name)
+    if not accounts:
+        return f"❌ No accounts found matching '{criteria}'"
 
-        elif function_name == "list_users":
-            return crm_manager.list_users_for_assignment()
+    return format_search_results(f"**Found {len(accounts)} account(s):**\n\n",
+                                 accounts[:10], _ACCOUNT_RESULT_FIELDS)
 
-        else:
+
+def _handle_create_account(arguments: dict, user_input: str) -> str:
+    result_msg, account_id = crm_manager.create_account(**arguments)
+    return result_msg
+
+
+def _handle_get_account_details(arguments: dict, user_input: str) -> str:
+    account_name = arguments.get("account_name", "")
+    accounts = crm_manager.search_accounts(account_name)
+    if not accounts:
+        return f"❌ Account '{account_name}' not found"
+    account_id = accounts[0]['id']
+    return crm_manager.get_account_details(account_id)
+
+
+def _handle_link_contact_to_account(arguments: dict, user_input: str) -> str:
+    contact_name = arguments.get("contact_name", "")
+    account_name = arguments.get("account_name", "")
+    primary = arguments.get("primary", True)
+    return crm_manager.link_contact_to_account(contact_name, account_name, primary)
+
+
+# TASK AND REMINDER FUNCTIONS
+def _handle_create_task(arguments: dict, user_input: str) -> str:
+    name = arguments.get("name", "")
+    assigned_to = arguments.get("assigned_to")
+    due_date = arguments.get("due_date")
+    description = arguments.get("description")
+    priority = arguments.get("priority", "Normal")
+    related_contact = arguments.get("related_contact")
+
+    return crm_manager.create_task(
+        name=name,
+        assigned_to=assigned_to,
+        due_date=due_date,
+        description=description,
+        priority=priority,
+        related_contact=related_contact
+    )
+
+
+def _handle_create_reminder(arguments: dict, user_input: str) -> str:
+    reminder_text = arguments.get("reminder_text", "")
+    for_user = arguments.get("for_user")
+    due_date = arguments.get("due_date")
+    related_contact = arguments.get("related_contact")
+
+    return crm_manager.create_reminder(
+        reminder_text=reminder_text,
+        for_user=for_user,
+        due_date=due_date,
+        related_contact=related_contact
+    )
+
+
+def _handle_get_user_tasks(arguments: dict, user_input: str) -> str:
+    user_name = arguments.get("user_name")
+    status_filter = arguments.get("status_filter", "open")
+    return crm_manager.get_user_tasks(user_name=user_name, status_filter=status_filter)
+
+
+def _handle_complete_task(arguments: dict, user_input: str) -> str:
+    task_name = arguments.get("task_name", "")
+    user_name = arguments.get("user_name")
+    return crm_manager.update_task_status(task_name, "Completed", user_name)
+
+
+def _handle_list_users(arguments: dict, user_input: str) -> str:
+    return crm_manager.list_users_for_assignment()
+
+
+FUNCTION_HANDLERS = {
+    "search_contacts": _handle_search_contacts,
+    "update_contact": _handle_update_contact,
+    "create_contact": _handle_create_contact,
+    "get_contact_details": _handle_get_contact_details,
+    "add_note": _handle_add_note,
+    "get_contact_notes": _handle_get_contact_notes,
+    "parse_resume": _handle_parse_resume,
+    "list_all_contacts": _handle_list_all_contacts,
+    "search_accounts": _handle_search_accounts,
+    "create_account": _handle_create_account,
+    "get_account_details": _handle_get_account_details,
+    "link_contact_to_account": _handle_link_contact_to_account,
+    "create_task": _handle_create_task,
+    "create_reminder": _handle_create_reminder,
+    "get_user_tasks": _handle_get_user_tasks,
+    "complete_task": _handle_complete_task,
+    "list_users": _handle_list_users,
+}
+
+
+def handle_function_call(function_name: str, arguments: dict, user_input: str = "") -> str:
+    """
+    Simplified function handler - just executes what AI decided
+    """
+    try:
+        logger.info("⚡ EXECUTING: %s with %s", function_name, arguments)
+
+        handler = FUNCTION_HANDLERS.get(function_name)
+        if handler is None:
             return f"❌ Unknown function: {function_name}"
+        if arguments is None:
+            return f"⚠️ Error executing {function_name}: the request arguments could not be read"
+        started = time.perf_counter()
+        try:
+            return handler(arguments, user_input)
+        finally:
+            logger.info("⏱️ %s took %.0f ms", function_name, (time.perf_counter() - started) * 1000)
             
     except Exception as e:
         logger.error(f"❌ Function execution error: {e}")
@@ -945,7 +1213,6 @@ def handle_function_call(function_name: str, arguments: dict, user_input: str =
 def set_current_calendar_user(user_name: str):
     """Remember the current user for calendar operations"""
     session['current_calendar_user'] = user_name
-    session.modified = True
 
 def get_current_calendar_user():
     """Get the current user for calendar operations"""
@@ -978,28 +1245,130 @@ class PrefixMiddleware(object):
 
 app.wsgi_app = PrefixMiddleware(app.wsgi_app)
 
+# Session handling for paths that don't need server-side session storage
+STATIC_PATHS = {'/favicon.ico', '/robots.txt'}
+READ_ONLY_SESSION_PATHS = {'/debug'}
+
+def is_static_path(path: str) -> bool:
+    """True for static assets, which need neither a session nor auth"""
+    return path in STATIC_PATHS or path.startswith('/static/')
+
+def is_stateless_request(request) -> bool:
+    """True for API callers authenticating with the Authorization header"""
+    return verify_token(request.headers.get('Authorization'), AUTH_TOKEN)
+
+class ReadOnlyPathSessionInterface(SessionInterface):
+    """Wrap the Flask-Session interface to skip storage work where it isn't needed
+
+    Static assets never load the session at all. Read-only pages such as /debug
+    load it normally but never write it back to the session store. Requests
+    carrying the access token in the Authorization header get a throwaway
+    authenticated session that is neither loaded nor saved.
+    """
+
+    def __init__(self, inner: SessionInterface):
+        self.inner = inner
+        # The wrapped interface sets the cookie expiry itself, so route it through ours
+        inner.get_expiration_time = self.get_expiration_time
+
+    def open_session(self, app, request):
+        if is_static_path(request.path):
+            return self.make_null_session(app)
+        if is_stateless_request(request):
+            request.environ['copilot.stateless'] = True
+            return self.inner.session_class({'authenticated': True}, permanent=True)
+        return self.inner.open_session(app, request)
+
+    def save_session(self, app, session, response):
+        if (self.is_null_session(session) or request.path in READ_ONLY_SESSION_PATHS
+                or request.environ.get('copilot.stateless')):
+            return
+        self.inner.save_session(app, session, response)
+
+    def get_expiration_time(self, app, session):
+        """Expire each session after its own login lifetime instead of an app-wide one"""
+        if session.permanent:
+            days = session.get('lifetime_days', SESSION_LIFETIME_DAYS)
+            return datetime.now(timezone.utc) + timedelta(days=days)
+        return None
+
 SECRET_KEY = os.getenv('FLASK_SECRET_KEY', 'espocrm-ai-copilot-secret-key-2024')
 app.secret_key = SECRET_KEY
 
-SESSION_DIR = Path(os.getenv('SESSION_DIR', '/opt/copilot/sessions'))
-SESSION_DIR.mkdir(exist_ok=True, mode=0o755)
+# Session storage backend - Redis when REDIS_URL is set (and the redis package
+# is installed), otherwise session files on local disk
+REDIS_URL = os.getenv('REDIS_URL')
+SESSION_BACKEND_CONFIG = None
+
+if REDIS_URL:
+    try:
+        import redis
+        SESSION_BACKEND_CONFIG = {
+            'SESSION_TYPE': 'redis',
+            'SESSION_REDIS': redis.Redis.from_url(REDIS_URL, socket_timeout=float(os.getenv('REDIS_SOCKET_TIMEOUT', 0.5))),
+        }
+        logger.info("✅ Using Redis session storage")
+    except ImportError:
+        logger.warning("⚠️ REDIS_URL is set but the redis package is not installed - using filesystem sessions")
+
+if SESSION_BACKEND_CONFIG is None:
+    SESSION_DIR = Path(os.getenv('SESSION_DIR', '/opt/copilot/sessions'))
+    SESSION_DIR.mkdir(exist_ok=True, mode=0o755)
+    SESSION_BACKEND_CONFIG = {
+        'SESSION_TYPE': 'filesystem',
+        'SESSION_FILE_DIR': str(SESSION_DIR),
+        'SESSION_FILE_THRESHOLD': 500,
+    }
+
+# Per-login session lifetimes (stored on the session itself at login)
+SESSION_LIFETIME_DAYS = int(os.getenv('SESSION_LIFETIME_DAYS', 7))
+REMEMBER_ME_LIFETIME_DAYS = int(os.getenv('REMEMBER_ME_LIFETIME_DAYS', 30))
 
 # ENHANCED Session Configuration
 app.config.update(
-    SESSION_TYPE='filesystem',
-    SESSION_FILE_DIR=str(SESSION_DIR),
+    SESSION_BACKEND_CONFIG,
     SESSION_PERMANENT=True,
+    # Only write sessions back to storage when something in them changed
+    SESSION_REFRESH_EACH_REQUEST=False,
     SESSION_USE_SIGNER=True,
     SESSION_KEY_PREFIX='copilot:',
-    SESSION_FILE_THRESHOLD=500,
     SESSION_COOKIE_NAME='copilot_session',
     SESSION_COOKIE_HTTPONLY=True,
     SESSION_COOKIE_SECURE=False,
     SESSION_COOKIE_SAMESITE='Lax',
-    PERMANENT_SESSION_LIFETIME=timedelta(days=7)
+    # Storage lifetime covers the longest login; cookies expire per session
+    PERMANENT_SESSION_LIFETIME=timedelta(days=max(SESSION_LIFETIME_DAYS, REMEMBER_ME_LIFETIME_DAYS))
 )
 
 Session(app)
+app.session_interface = ReadOnlyPathSessionInterface(app.session_interface)
+
+# Compiled templates - render_template_string recompiles its source on every call
+_compiled_templates = {}
+
+def get_compiled_template(source: str):
+    """Return the compiled Template for a template string, compiling it only once"""
+    template = _compiled_templates.get(source)
+    if template is None:
+        template = _compiled_templates[source] = app.jinja_env.from_string(source)
+    return template
+
+def render_cached_template(source: str, **context) -> str:
+    """Render a template string, compiling it only on first use"""
+    return render_template(get_compiled_template(source), **context)
+
+# Chat replies stream over /stream (server-sent events) unless disabled, e.g.
+# behind a proxy that buffers responses; the page then posts normally
+STREAM_RESPONSES = os.getenv('STREAM_RESPONSES', 'true').lower() != 'false'
+app.jinja_env.globals['stream_responses'] = STREAM_RESPONSES
+
+# Compile the page templates at startup instead of on the first request
+get_compiled_template(ENHANCED_TEMPLATE)
+get_compiled_template(LOGIN_TEMPLATE)
+
+# The /debug page is static apart from three values (authenticated, history
+# count, last contact), so pre-encode it once as a bytes %-format template
+DEBUG_PAGE = re.sub(r'\{\{ \w+ \}\}', '%b', DEBUG_TEMPLATE.replace('%', '%%')).encode()
 
 # Configuration
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
@@ -1033,36 +1402,41 @@ def after_request(response):
     response.headers['X-Content-Type-Options'] = 'nosniff'
     response.headers['X-XSS-Protection'] = '1; mode=block'
     response.headers['Referrer-Policy'] = 'strict-origin-when-cross-origin'
+    # Static assets don't change between deploys often - let browsers keep them
+    if response.status_code == 200 and is_static_path(request.path):
+        response.headers.setdefault('Cache-Control', 'public, max-age=86400')
     return response
 
 # Authentication
+AUTH_EXEMPT_PATHS = frozenset({'/login', '/reset', '/debug'})
+
 @app.before_request
 def require_auth_token():
-    if request.path in ['/login', '/reset', '/debug']:
+    if request.path in AUTH_EXEMPT_PATHS:
         return
 
     # Skip auth for static assets (don't save as next_url either)
-    if request.path in ['/favicon.ico', '/robots.txt'] or request.path.startswith('/static/'):
+    if is_static_path(request.path):
         return
 
     if session.get('authenticated'):
-        session.permanent = True
-        session.modified = True
+        # Assigning permanent marks the session modified, so only do it when
+        # it isn't already set - otherwise every request rewrites the session
+        if not session.permanent:
+            session.permanent = True
         return
 
     token = request.args.get('token') or request.headers.get('Authorization')
 
-    if token == AUTH_TOKEN:
+    if verify_token(token, AUTH_TOKEN):
         session['authenticated'] = True
         session.permanent = True
-        session.modified = True
-        logger.info(f"✅ TOKEN AUTH: Direct token authentication from {request.remote_addr}")
+        logger.info("✅ TOKEN AUTH: Direct token authentication from %s", request.remote_addr)
         return
 
-    logger.info(f"🔒 AUTH REQUIRED: Redirecting {request.remote_addr} to login")
+    logger.info("🔒 AUTH REQUIRED: Redirecting %s to login", request.remote_addr)
     # Save the original URL so we can redirect back after login (only for actual pages)
     session['next_url'] = request.url
-    session.modified = True
     return redirect(url_for('login'))
 
 # Function definitions for OpenAI
@@ -1266,7 +1640,7 @@ simple_functions = [
             }
         }
     },
-    # TASK AND REMINDER FUNCTIONS
+# TASK AND REMINDER FUNCTIONS
     {
         "type": "function",
         "function": {
@@ -1346,6 +1720,74 @@ simple_functions = [
 ]
 
 
+def process_resume_upload(file):
+    """Extract one uploaded resume and create/update its contact
+
+    Returns (upload note for the history or None, message to show).
+    """
+    try:
+        logger.info("📄 Processing uploaded file: %s", file.filename)
+        logger.info("📄 File size: %s bytes", file.content_length if hasattr(file, 'content_length') else 'unknown')
+
+        # Read the upload once; text extraction and the CRM
+        # attachment both work from this in-memory copy
+        file_obj = BytesIO(file.read())
+        file_obj.filename = file.filename
+        file_obj.name = file.filename
+
+        content, error = resume_parser.process_uploaded_file(file_obj)
+
+        logger.info("📋 File processing result - Content length: %s, Error: %s", len(content) if content else 0, error)
+        if content and logger.isEnabledFor(logging.INFO):
+            # Log first 500 chars to help debug name extraction
+            preview = content[:500].replace('\n', ' ')
+            logger.info("📋 Content preview: %s...", preview)
+
+        if error:
+            logger.warning("⚠️ File processing error: %s", error)
+            return None, error
+        if not content or len(content.strip()) < 10:
+            logger.warning("⚠️ Content too short: %s characters", len(content) if content else 0)
+            return None, "❌ No content extracted from file. Please check the file format."
+
+        logger.info("✅ File content extracted successfully, length: %s", len(content))
+
+        # Process with parse_resume function, rewinding the
+        # in-memory copy for the attachment upload
+        file_obj.seek(0)
+
+        output = handle_function_call("parse_resume", {
+            "resume_text": content[:10000],
+            "resume_file": file_obj
+        })
+        return f"📎 Uploaded resume: {file.filename}", output
+
+    except Exception as e:
+        logger.error("❌ Unexpected file upload error: %s", e, exc_info=True)
+        return None, f"❌ Error processing file: {str(e)}\n\nPlease try again or use a different file format."
+
+
+def check_duplicate_submit(user_input: str):
+    """Hash a prompt and return (hash, previous output) - the output is None
+    unless the same prompt was answered within DUPLICATE_SUBMIT_WINDOW"""
+    input_hash = hashlib.blake2b(user_input.encode(), digest_size=8).hexdigest()
+    last_submit = session.get('last_submit') or {}
+    if (last_submit.get('hash') == input_hash
+            and time.time() - last_submit.get('timestamp', 0) < DUPLICATE_SUBMIT_WINDOW):
+        logger.info("🔁 DUPLICATE SUBMIT: Reusing previous response")
+        return input_hash, last_submit.get('output', '')
+    return input_hash, None
+
+
+def remember_submit(input_hash: str, output: str) -> None:
+    """Record the answered prompt for check_duplicate_submit"""
+    session['last_submit'] = {
+        'hash': input_hash,
+        'timestamp': time.time(),
+        'output': output
+    }
+
+
 # Routes
 @app.route('/', methods=['GET', 'POST'])
 def index():
@@ -1356,219 +1798,179 @@ def index():
         return "Session initialization failed", 500
     
     output = ""
+    history = load_history()
     
     if request.method == 'POST':
         user_input = None
 
-        # Handle file upload
+        # Handle file upload (one resume, or several dropped at once)
         if 'resume_file' in request.files:
-            file = request.files['resume_file']
-
-            if file and file.filename:
-                try:
-                    logger.info(f"📄 Processing uploaded file: {file.filename}")
-                    logger.info(f"📄 File size: {file.content_length if hasattr(file, 'content_length') else 'unknown'} bytes")
-
-                    # Read file into memory to preserve it
-                    file_bytes = file.read()
-                    file.seek(0)  # Reset file pointer for processing
-
-                    content, error = resume_parser.process_uploaded_file(file)
-
-                    logger.info(f"📋 File processing result - Content length: {len(content) if content else 0}, Error: {error}")
-                    if content:
-                        # Log first 500 chars to help debug name extraction
-                        preview = content[:500].replace('\n', ' ')
-                        logger.info(f"📋 Content preview: {preview}...")
-
-                    if error:
-                        output = error
-                        logger.warning(f"⚠️ File processing error: {error}")
-                        session['conversation_history'].append({"role": "assistant", "content": output})
-                        session.modified = True
-                    elif not content or len(content.strip()) < 10:
-                        output = "❌ No content extracted from file. Please check the file format."
-                        logger.warning(f"⚠️ Content too short: {len(content) if content else 0} characters")
-                        session['conversation_history'].append({"role": "assistant", "content": output})
-                        session.modified = True
-                    else:
-                        # Store file info in session temporarily
-                        session['temp_resume_file'] = {
-                            'filename': file.filename,
-                            'data': file_bytes
-                        }
-                        session.modified = True
-
-                        # Let AI extract and create contact directly via parse_resume
-                        user_input = f"Parse this resume file: {file.filename}"
-                        logger.info(f"✅ File content extracted successfully, length: {len(content)}")
-
-                        # Add file info to conversation for context
-                        session['conversation_history'].append({"role": "user", "content": f"📎 Uploaded resume: {file.filename}"})
-
-                        # Process with parse_resume function
-                        # Create a proper file-like object for upload
-                        from io import BytesIO
-                        file_obj = BytesIO(file_bytes)
-                        file_obj.filename = file.filename
-                        file_obj.name = file.filename
-
-                        output = handle_function_call("parse_resume", {
-                            "resume_text": content[:10000],
-                            "resume_file": file_obj
-                        })
-
-                        # Add the assistant's detailed response to conversation history
-                        if output:
-                            session['conversation_history'].append({"role": "assistant", "content": output})
-                            session.modified = True
-
-                        # Clean up temp session data
-                        if 'temp_resume_file' in session:
-                            session.pop('temp_resume_file')
-                            session.modified = True
-
-                except Exception as e:
-                    logger.error(f"❌ Unexpected file upload error: {e}", exc_info=True)
-                    output = f"❌ Error processing file: {str(e)}\n\nPlease try again or use a different file format."
-                    session['conversation_history'].append({"role": "assistant", "content": output})
-                    session.modified = True
+            files = [f for f in request.files.getlist('resume_file') if f and f.filename]
+
+            if len(files) == 1:
+                outcomes = [process_resume_upload(files[0])]
+            elif files:
+                # Each resume is an independent extraction + CRM lookup/create
+                # round trip - run them side by side instead of back to back
+                logger.info("📄 Processing %s uploaded files concurrently", len(files))
+                outcomes = map_in_request_context(process_resume_upload, [(f,) for f in files])
             else:
+                outcomes = []
                 output = "❌ No file selected or file is empty."
                 logger.warning("⚠️ No file or filename provided")
-                session['conversation_history'].append({"role": "user", "content": "Attempted to upload resume"})
-                session['conversation_history'].append({"role": "assistant", "content": output})
-                session.modified = True
+                push_history(history, "Attempted to upload resume", output)
+
+            for upload_note, file_output in outcomes:
+                if upload_note:
+                    # Add file info to conversation for context
+                    history.append({"role": "user", "content": upload_note})
+                if file_output:
+                    history.append({"role": "assistant", "content": file_output})
+            if outcomes:
+                output = "\n\n".join(file_output for _, file_output in outcomes if file_output)
         else:
             user_input = sanitize_input(request.form.get('prompt', ''))
         
         if user_input and not output:
-            try:
-                # Add to history
-                session['conversation_history'].append({"role": "user", "content": user_input})
-                
-                # Process with AI-first approach
-                output = process_user_request(user_input, session['conversation_history'])
-                
-                # Ensure we always have output
-                if not output or output.strip() == "":
-                    output = "✅ Operation completed. Please check your CRM."
-                
-                # Add to history
-                session['conversation_history'].append({"role": "assistant", "content": output})
-                
-                # Keep history manageable
-                if len(session['conversation_history']) > 40:
-                    session['conversation_history'] = session['conversation_history'][-30:]
-                
-                session.modified = True
-                
-            except Exception as e:
-                logger.error(f"Request processing failed: {e}")
-                output = f"⚠️ Something went wrong: {str(e)}\n\nPlease try again."
-                session['conversation_history'].append({"role": "assistant", "content": output})
-                session.modified = True
-    
-    # Import template
-    try:
-        from templates import ENHANCED_TEMPLATE, LOGIN_TEMPLATE
-    except ImportError as e:
-        logger.error(f"Template import error: {e}")
-        return "Template error - please check templates.py file"
+            # Debounce double-submits and browser retries of the same prompt
+            input_hash, previous_output = check_duplicate_submit(user_input)
+            if previous_output is not None:
+                output = previous_output
+            else:
+                try:
+                    # Process with AI-first approach (the prompt itself is
+                    # sent by process_user_request, not through the history)
+                    output = process_user_request(user_input, history)
+                    
+                    # Ensure we always have output
+                    if not output or output.isspace():
+                        output = DEFAULT_OK_MESSAGE
+                    
+                    # Add the exchange to history (the deque keeps it bounded)
+                    push_history(history, user_input, output)
+                    remember_submit(input_hash, output)
+                    
+                except Exception as e:
+                    logger.error("Request processing failed: %s", e)
+                    output = f"⚠️ Something went wrong: {str(e)}\n\nPlease try again."
+                    push_history(history, user_input, output)
+        
+        # Write the history back to the session once per request
+        save_history(history)
     
-    return render_template_string(ENHANCED_TEMPLATE, 
+    return render_cached_template(ENHANCED_TEMPLATE, 
                                 output=output, 
-                                history=session.get('conversation_history', []),
+                                history=history,
                                 last_contact=get_last_contact())
 
+@app.route('/stream', methods=['POST'])
+def stream():
+    """Server-sent events version of the chat POST - text is sent as the AI
+    produces it; the page re-renders from / once the 'done' event arrives"""
+    if not STREAM_RESPONSES:
+        return "Streaming is disabled", 404
+    if not init_session():
+        return "Session initialization failed", 500
+
+    user_input = sanitize_input(request.form.get('prompt', ''))
+    if not user_input:
+        return "❌ Empty prompt", 400
+
+    # Same double-submit debounce as the regular POST - a retry must not
+    # run the model (and any write it asks for) a second time
+    input_hash, previous_output = check_duplicate_submit(user_input)
+    if previous_output is not None:
+        def replay():
+            yield f"data: {json.dumps(previous_output)}\n\n"
+            yield "event: done\ndata: {}\n\n"
+        return Response(replay(), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+    history = load_history()
+
+    @stream_with_context
+    def generate():
+        parts = []
+        try:
+            for text in stream_user_request(user_input, history):
+                parts.append(text)
+                yield f"data: {json.dumps(text)}\n\n"
+            yield "event: done\ndata: {}\n\n"
+        finally:
+            # Runs even if the client disconnects mid-stream (GeneratorExit) -
+            # any write a tool already made must reach the history, and the
+            # duplicate-submit record must stop a retry from repeating it
+            output = "".join(parts)
+            if not output or output.isspace():
+                output = DEFAULT_OK_MESSAGE
+            push_history(history, user_input, output)
+            save_history(history)
+            remember_submit(input_hash, output)
+            # The response (and its session save) went out before this body ran -
+            # write the updated history and contact context to the store now
+            app.session_interface.save_session(app, session, Response())
+
+    return Response(generate(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 @app.route('/login', methods=['GET', 'POST'])
 @rate_limit_login
 def login():
-    from templates import LOGIN_TEMPLATE
-    
+    # Honeypot submissions are answered by @rate_limit_login before this runs
     if request.method == 'POST':
-        if check_honeypot(request.form):
-            logger.warning(f"🍯 HONEYPOT: Bot detected from IP {request.remote_addr}")
-            time.sleep(2)
-            return render_template_string(LOGIN_TEMPLATE, 
-                error="Invalid access token. Please try again.")
-        
         provided_token = request.form.get('token', '').strip()
         remember_me = request.form.get('remember_me') == 'on'
         
-        if provided_token == AUTH_TOKEN:
+        if verify_token(provided_token, AUTH_TOKEN):
             session['authenticated'] = True
             session.permanent = True
             
             if remember_me:
-                app.permanent_session_lifetime = timedelta(days=30)
-                logger.info(f"✅ EXTENDED LOGIN: 30-day session for {request.remote_addr}")
+                session['lifetime_days'] = REMEMBER_ME_LIFETIME_DAYS
+                logger.info("✅ EXTENDED LOGIN: %s-day session for %s", REMEMBER_ME_LIFETIME_DAYS, request.remote_addr)
             else:
-                app.permanent_session_lifetime = timedelta(days=7)
-                logger.info(f"✅ STANDARD LOGIN: 7-day session for {request.remote_addr}")
+                session['lifetime_days'] = SESSION_LIFETIME_DAYS
+                logger.info("✅ STANDARD LOGIN: %s-day session for %s", SESSION_LIFETIME_DAYS, request.remote_addr)
             
-            session.modified = True
             # Redirect to original URL if set, otherwise go to index
             next_url = session.pop('next_url', None)
             if next_url:
-                logger.info(f"↩️ Redirecting to saved URL: {next_url}")
+                logger.info("↩️ Redirecting to saved URL: %s", next_url)
                 return redirect(next_url)
             return redirect(url_for('index'))
         else:
             error_msg = handle_failed_login(request.remote_addr)
-            logger.warning(f"🚫 FAILED LOGIN: {request.remote_addr}")
-            return render_template_string(LOGIN_TEMPLATE, error=error_msg)
+            logger.warning("🚫 FAILED LOGIN: %s", request.remote_addr)
+            return render_cached_template(LOGIN_TEMPLATE, error=error_msg)
     
-    return render_template_string(LOGIN_TEMPLATE)
+    return render_cached_template(LOGIN_TEMPLATE)
 
 @app.route('/logout')
 def logout():
     session.clear()
-    logger.info(f"User logged out from {request.remote_addr}")
+    logger.info("User logged out from %s", request.remote_addr)
     return redirect(url_for('login'))
 
 @app.route('/reset')
 def reset():
-    if 'conversation_history' in session:
-        session['conversation_history'] = []
-    if 'last_contact' in session:
-        session.pop('last_contact', None)
-    if 'current_calendar_user' in session:
-        session.pop('current_calendar_user', None)
-    session.modified = True
-    logger.info(f"Conversation reset for authenticated user from {request.remote_addr}")
+    # pop() only marks the session modified when the key was actually present
+    for key in RESET_SESSION_KEYS:
+        session.pop(key, None)
+    logger.info("Conversation reset for authenticated user from %s", request.remote_addr)
     return redirect(url_for('index'))
 
 @app.route('/debug')
 def debug():
     """Simple debug endpoint"""
-    last_contact = get_last_contact()
-    return f'''
-    <html>
-    <head><title>EspoCRM AI Copilot Debug</title></head>
-    <body style="font-family: Arial, sans-serif; max-width: 800px; margin: 20px auto; padding: 20px;">
-        <h2>🔍 EspoCRM AI Copilot Debug Info</h2>
-        
-        <div style="background: #e8f5e8; padding: 15px; border-radius: 5px; margin: 20px 0;">
-            <h3>Session Status</h3>
-            <table style="width: 100%; border-collapse: collapse;">
-                <tr><td><strong>Authenticated:</strong></td><td>{session.get('authenticated', False)}</td></tr>
-                <tr><td><strong>History Count:</strong></td><td>{len(session.get('conversation_history', []))}</td></tr>
-                <tr><td><strong>Last Contact:</strong></td><td>{last_contact}</td></tr>
-            </table>
-        </div>
-        
-        <div style="background: #f8f9fa; padding: 15px; border-radius: 5px; margin: 20px 0;">
-            <h3>Architecture</h3>
-            <p><strong>Processing Mode:</strong> AI-First Intelligence</p>
-            <p><strong>Approach:</strong> AI understands intent → Execute simple functions</p>
-            <p><strong>Benefits:</strong> Natural language, context-aware, self-learning</p>
-        </div>
-        
-        <p><a href="/">🏠 Main App</a> | <a href="/logout">🚪 Logout</a> | <a href="/reset">🔄 Reset</a></p>
-    </body>
-    </html>
-    '''
+    # Only build the page for logged-in users; probes get a bare 401
+    if not session.get('authenticated'):
+        return "Unauthorized", 401
+    
+    return DEBUG_PAGE % (
+        b'True',
+        str(len(load_history())).encode(),
+        html.escape(str(get_last_contact())).encode()
+    )
 
 @app.route('/quickadd/extension')
 def quickadd_extension():
@@ -1589,10 +1991,9 @@ def quickadd():
     # Check authentication
     if not session.get('authenticated'):
         token = request.args.get('token')
-        if token == AUTH_TOKEN:
+        if verify_token(token, AUTH_TOKEN):
             session['authenticated'] = True
             session.permanent = True
-            session.modified = True
         else:
             return redirect(url_for('login'))
 
@@ -1799,8 +2200,7 @@ Return ONLY valid JSON, no explanation."""
     # Get text from query param (from bookmarklet)
     initial_text = request.args.get('text', '')
 
-    from templates import QUICKADD_TEMPLATE
-    return render_template_string(QUICKADD_TEMPLATE,
+    return render_cached_template(QUICKADD_TEMPLATE,
                                   initial_text=initial_text,
                                   parsed_data=parsed_data,
                                   result=result,
@@ -1815,10 +2215,9 @@ def quickemail():
     # Check authentication
     if not session.get('authenticated'):
         token = request.args.get('token')
-        if token == AUTH_TOKEN:
+        if verify_token(token, AUTH_TOKEN):
             session['authenticated'] = True
             session.permanent = True
-            session.modified = True
         else:
             return redirect(url_for('login'))
 
@@ -1992,19 +2391,20 @@ Return JSON only:
                         email_data["parentId"] = contact_id
                         email_data["parentType"] = "Contact"
 
-                    # Create the email using direct API call
-                    import requests as req
+                    # Create the email using direct API call over the CRM
+                    # manager's pooled session (reuses its keep-alive connections)
                     api_url = crm_manager.espocrm_url
                     api_headers = crm_manager.headers
 
-                    create_resp = req.post(f"{api_url}/Email", json=email_data, headers=api_headers)
+                    create_resp = crm_manager.session.post(f"{api_url}/Email", json=email_data, headers=api_headers, timeout=60)
                     create_result = create_resp.json() if create_resp.ok else None
 
                     if create_result and 'id' in create_result:
                         email_id = create_result['id']
 
-                        # Send the email by setting status to Sending
-                        send_resp = req.put(f"{api_url}/Email/{email_id}", json={"status": "Sending"}, headers=api_headers)
+                        # Send the email by setting status to Sending - never
+                        # retried, a repeat after a gateway timeout could send twice
+                        send_resp = crm_manager.send_session.put(f"{api_url}/Email/{email_id}", json={"status": "Sending"}, headers=api_headers, timeout=60)
                         send_result = send_resp.json() if send_resp.ok else None
 
                         if send_result and send_result.get('status') == 'Sent':
@@ -2024,12 +2424,11 @@ Return JSON only:
                 logger.error(f"Send email error: {e}")
                 error = f"Failed to send email: {str(e)}"
 
-    from templates import QUICKEMAIL_TEMPLATE
     recent_emails = get_recent_emails()
     ai_context = get_ai_context()
     email_templates = get_email_templates()
     selected_template_id = request.form.get('selected_template_id', '') if request.method == 'POST' else ''
-    return render_template_string(QUICKEMAIL_TEMPLATE,
+    return render_cached_template(QUICKEMAIL_TEMPLATE,
                                   contact_id=contact_id,
                                   first_name=first_name,
                                   last_name=last_name,
@@ -2061,7 +2460,7 @@ def email_templates_api():
                 token = request.get_json().get('token')
             except:
                 pass
-        if token == AUTH_TOKEN:
+        if verify_token(token, AUTH_TOKEN):
             session['authenticated'] = True
         else:
             return json.dumps({'error': 'Unauthorized'}), 401, {'Content-Type': 'application/json'}
@@ -2127,7 +2526,7 @@ def quickadd_task():
     # Check authentication
     if not session.get('authenticated'):
         token = request.form.get('token') or (request.get_json() or {}).get('token')
-        if token == AUTH_TOKEN:
+        if verify_token(token, AUTH_TOKEN):
             session['authenticated'] = True
         else:
             return json.dumps({'error': 'Unauthorized'}), 401, {'Content-Type': 'application/json'}
@@ -2162,7 +2561,7 @@ def manage_templates():
     # Check authentication
     if not session.get('authenticated'):
         token = request.args.get('token')
-        if token == AUTH_TOKEN:
+        if verify_token(token, AUTH_TOKEN):
             session['authenticated'] = True
             session.permanent = True
         else:
@@ -2425,10 +2824,9 @@ def quickcontext():
     # Check authentication
     if not session.get('authenticated'):
         token = request.args.get('token')
-        if token == AUTH_TOKEN:
+        if verify_token(token, AUTH_TOKEN):
             session['authenticated'] = True
             session.permanent = True
-            session.modified = True
         else:
             return redirect(url_for('login'))
 
@@ -2440,141 +2838,7 @@ def quickcontext():
 
     current_context = get_ai_context()
 
-    CONTEXT_TEMPLATE = '''
-<!doctype html>
-<html>
-<head>
-    <title>📝 AI Context Notes</title>
-    <meta charset="utf-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1">
-    <style>
-        * { margin: 0; padding: 0; box-sizing: border-box; }
-        body {
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
-            background: linear-gradient(135deg, #7C3AED 0%, #A78BFA 100%);
-            min-height: 100vh;
-            padding: 20px;
-        }
-        .container {
-            max-width: 500px;
-            margin: 0 auto;
-            background: white;
-            border-radius: 16px;
-            box-shadow: 0 10px 40px rgba(0,0,0,0.2);
-            overflow: hidden;
-        }
-        .header {
-            background: linear-gradient(135deg, #7C3AED, #A78BFA);
-            color: white;
-            padding: 20px;
-            text-align: center;
-        }
-        .header h1 { font-size: 20px; font-weight: 600; }
-        .header p { font-size: 13px; opacity: 0.9; margin-top: 4px; }
-        .content { padding: 20px; }
-        .form-group { margin-bottom: 16px; }
-        label {
-            display: block;
-            font-size: 12px;
-            font-weight: 600;
-            color: #64748B;
-            margin-bottom: 6px;
-            text-transform: uppercase;
-        }
-        textarea {
-            width: 100%;
-            padding: 12px;
-            border: 2px solid #E2E8F0;
-            border-radius: 8px;
-            font-size: 14px;
-            min-height: 200px;
-            resize: vertical;
-            font-family: inherit;
-            line-height: 1.5;
-        }
-        textarea:focus {
-            outline: none;
-            border-color: #7C3AED;
-        }
-        .btn {
-            width: 100%;
-            padding: 14px;
-            border: none;
-            border-radius: 8px;
-            font-size: 15px;
-            font-weight: 600;
-            cursor: pointer;
-            background: linear-gradient(135deg, #7C3AED, #A78BFA);
-            color: white;
-            margin-bottom: 10px;
-        }
-        .btn:hover {
-            transform: translateY(-1px);
-            box-shadow: 0 4px 12px rgba(124, 58, 237, 0.3);
-        }
-        .success {
-            background: #DCFCE7;
-            color: #166534;
-            padding: 12px;
-            border-radius: 8px;
-            margin-bottom: 16px;
-            text-align: center;
-            font-weight: 500;
-        }
-        .help-text {
-            font-size: 12px;
-            color: #64748B;
-            margin-top: 8px;
-            line-height: 1.5;
-        }
-        .close-btn {
-            display: block;
-            text-align: center;
-            padding: 12px;
-            color: #64748B;
-            text-decoration: none;
-            font-size: 13px;
-        }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>📝 AI Context Notes</h1>
-            <p>Persistent notes the AI always sees when generating emails</p>
-        </div>
-        <div class="content">
-            {% if saved %}
-            <div class="success">✅ Context saved!</div>
-            {% endif %}
-
-            <form method="POST">
-                <div class="form-group">
-                    <label>Context Notes</label>
-                    <textarea name="context" placeholder="Add context the AI should always know about...
-
-Examples:
-• We just released our Winter 2025 newsletter
-• Currently hiring for 3 ML Engineer roles
-• New partnership with TechCorp announced
-• Holiday office closure Dec 23-Jan 2
-• Mention our new AI recruiting tools">{{ current_context }}</textarea>
-                    <p class="help-text">
-                        These notes are included in EVERY email generation. Use for current events,
-                        campaigns, talking points, or anything you want the AI to potentially reference.
-                    </p>
-                </div>
-
-                <button type="submit" class="btn">💾 Save Context</button>
-            </form>
-
-            <a href="javascript:window.close()" class="close-btn">Close Window</a>
-        </div>
-    </div>
-</body>
-</html>
-'''
-    return render_template_string(CONTEXT_TEMPLATE, current_context=current_context, saved=saved)
+    return render_cached_template(CONTEXT_TEMPLATE, current_context=current_context, saved=saved)
 
 
 if __name__ == '__main__':
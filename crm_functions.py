@@ -2,22 +2,267 @@
 # Core CRM operations for FluencyCare Copilot
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import logging
 import time
-import json
 import re
+import functools
+import unicodedata
 from typing import List, Dict, Any, Tuple, Optional
-from utils import format_phone_for_crm, create_phone_number_data, test_phone_formats_with_crm
+# orjson is optional - fall back to the stdlib json module if it isn't installed
+try:
+    import orjson as _json
+except ImportError:
+    import json as _json
+from utils import format_phone_for_crm, test_phone_formats_with_crm, strip_non_digits
 
 logger = logging.getLogger(__name__)
 
+# Contact search results are cached briefly so multi-turn conversations
+# ("find X" -> "update X" -> "add note to X") don't re-query the CRM each turn
+SEARCH_CACHE_TTL = 300  # seconds
+SEARCH_CACHE_SIZE = 256
+
+# Active users change rarely; one task or calendar request can need the list
+# two or three times (lookup, then the "who did you mean" listing)
+USERS_CACHE_TTL = 300  # seconds
+
+# Account lookups repeat within a turn ("details for Acme, then update Acme")
+# and across turns; the cache is dropped whenever an account is written
+ACCOUNT_CACHE_TTL = 300  # seconds
+ACCOUNT_CACHE_SIZE = 128
+
+# Key sets used to split contact payloads; built once instead of per call
+_PHONE_KEYS = frozenset({'phoneNumber', 'phoneNumberData'})
+_PHONE_EMAIL_KEYS = _PHONE_KEYS | {'emailAddress', 'emailAddressData'}
+_CONFLICT_SKIP_KEYS = frozenset({'firstName', 'lastName', 'emailAddress'})
+_HIDDEN_USERNAMES = frozenset({'system', 'backupadmin'})
+
+# (label, field) rows of the contact details view, in display order
+_CONTACT_DETAIL_FIELDS = (
+    ('Email', 'emailAddressData'),
+    ('Phone', 'phoneNumberData'),
+    ('Title', 'cCurrentTitle'),
+    ('Current Company', 'cCurrentCompany'),
+    ('Skills', 'cSkills'),
+    ('LinkedIn', 'cLinkedInURL'),
+    ('Street Address', 'addressStreet'),
+    ('City', 'addressCity'),
+    ('State', 'addressState'),
+    ('Postal Code', 'addressPostalCode'),
+    ('Country', 'addressCountry'),
+    ('Created', 'createdAt'),
+    ('Modified', 'modifiedAt'),
+)
+
+def _invalidates_search_cache(method):
+    """Clear the contact search cache after a method that writes contacts"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self._search_cache.clear()
+            self._contact_index.clear()
+            self._word_trie.clear()
+    return wrapper
+
+def _invalidates_account_cache(method):
+    """Clear the account search cache after a method that writes accounts"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self._account_cache.clear()
+    return wrapper
+
+def _is_single_word_query(query: str) -> bool:
+    """True for a bare name fragment like 'doug' - no spaces, digits or @"""
+    return bool(query) and query.isalpha()
+
+def _fold_name(text: str) -> str:
+    """Case- and accent-insensitive form of a name, matching how the CRM's
+    'contains' filter (a SQL LIKE under the database collation) compares"""
+    decomposed = unicodedata.normalize('NFKD', text.casefold())
+    return ''.join(char for char in decomposed if not unicodedata.combining(char))
+
+_PHONE_QUERY_PATTERN = re.compile(r'\+?[\d\s\-\(\)\.]{10,}')
+
+def contact_index_key(value: Optional[str]) -> Optional[str]:
+    """Normalize an email, phone number or full name into a contact index key"""
+    if not value:
+        return None
+    value = value.strip()
+    if '@' in value:
+        return 'email:' + value.lower()
+    if _PHONE_QUERY_PATTERN.fullmatch(value):
+        phone = format_phone_for_crm(value)
+        return 'phone:' + phone if len(phone) >= 10 else None
+    name = ' '.join(value.lower().split())
+    return 'name:' + name if name else None
+
+def best_contact_match(contacts: List[Dict[str, Any]], query: str) -> Dict[str, Any]:
+    """Pick the contact whose name matches query exactly (case-insensitive),
+    then one whose name contains it, falling back to the first search result"""
+    query_lower = (query or '').strip().lower()
+    partial = None
+    # One pass, each name lowercased once; stop at the first exact match
+    for contact in contacts:
+        name_lower = (contact.get('name') or '').strip().lower()
+        if name_lower == query_lower:
+            return contact
+        if partial is None and query_lower and query_lower in name_lower:
+            partial = contact
+    return partial or contacts[0]
+
 class CRMManager:
     def __init__(self, espocrm_url: str, headers: Dict[str, str]):
         self.espocrm_url = espocrm_url
         self.headers = headers
+        # One pooled session so CRM calls reuse keep-alive connections
+        # instead of paying a TCP/TLS handshake per request
+        self.session = requests.Session()
+        self.session.headers.update(headers)
+        # Pool sized for the server's request threads plus concurrent tool
+        # calls; retry connection failures and gateway errors on idempotent
+        # requests (urllib3 never re-sends a POST that reached the server)
+        adapter = HTTPAdapter(
+            pool_connections=10,
+            pool_maxsize=32,
+            max_retries=Retry(total=2, backoff_factor=0.2,
+                              status_forcelist=(502, 503, 504), raise_on_status=False)
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        # Requests whose side effect goes beyond the record - setting an
+        # email's status to Sending sends it - must never be re-sent after a
+        # gateway error, so they use a pooled session with no retries at all
+        self.send_session = requests.Session()
+        self.send_session.headers.update(headers)
+        single_shot = HTTPAdapter(pool_connections=2, pool_maxsize=8, max_retries=Retry(total=0, raise_on_status=False))
+        self.send_session.mount('http://', single_shot)
+        self.send_session.mount('https://', single_shot)
+        # normalized criteria -> (timestamp, contacts)
+        self._search_cache: Dict[str, Tuple[float, List[Dict[str, Any]]]] = {}
+        # exact email / full name / phone key -> (timestamp, contacts)
+        self._contact_index: Dict[str, Tuple[float, List[Dict[str, Any]]]] = {}
+        # character trie of single-word searches whose full result we hold;
+        # the '' key of a node stores (timestamp, contacts) for that word
+        self._word_trie: Dict[str, Any] = {}
+        self._word_count = 0
+        # 'calendar' / 'tasks' user listing -> (timestamp, users)
+        self._users_cache: Dict[str, Tuple[float, List[Dict[str, Any]]]] = {}
+        # normalized account criteria -> (timestamp, accounts)
+        self._account_cache: Dict[str, Tuple[float, List[Dict[str, Any]]]] = {}
+
+    def _get_cached_users(self, kind: str) -> Optional[List[Dict[str, Any]]]:
+        """Return a user listing fetched within USERS_CACHE_TTL, if any"""
+        cached = self._users_cache.get(kind)
+        if cached and time.monotonic() - cached[0] < USERS_CACHE_TTL:
+            return cached[1]
+        return None
     
+    def find_contact(self, name: str) -> Optional[Dict[str, Any]]:
+        """Search contacts by name and return the best match, or None"""
+        contacts = self.search_contacts_simple(name)
+        if not contacts:
+            return None
+        return best_contact_match(contacts, name)
+
     def search_contacts_simple(self, criteria: str) -> List[Dict[str, Any]]:
-        """Fixed contact search using correct EspoCRM URL parameter format and field names"""
+        """Contact search with a short-lived cache in front of the CRM query"""
+        # Exact email / full name / phone seen in an earlier complete result
+        index_key = contact_index_key(criteria)
+        indexed = self._contact_index.get(index_key) if index_key else None
+        if indexed and time.monotonic() - indexed[0] < SEARCH_CACHE_TTL:
+            logger.info("🔍 SEARCH INDEX HIT: '%s'", criteria)
+            return list(indexed[1])
+
+        cache_key = (criteria or '').strip().lower()
+        cached = self._search_cache.get(cache_key)
+        if cached and time.monotonic() - cached[0] < SEARCH_CACHE_TTL:
+            logger.info("🔍 SEARCH CACHE HIT: '%s'", criteria)
+            return list(cached[1])
+
+        # A single word that extends an earlier fully-answered word ("Dou" ->
+        # "Doug") can only match a subset of that word's contacts
+        single_word = _is_single_word_query(cache_key)
+        if single_word:
+            prefix_contacts = self._lookup_word_prefix(cache_key)
+            if prefix_contacts is not None:
+                logger.info("🔍 SEARCH PREFIX HIT: '%s'", criteria)
+                # Filter the way the CRM would - "jose" must still find "José"
+                folded = _fold_name(cache_key)
+                return [contact for contact in prefix_contacts
+                        if folded in _fold_name(contact.get('firstName') or '')
+                        or folded in _fold_name(contact.get('lastName') or '')]
+
+        logger.info("🔍 SEARCH CACHE MISS: '%s'", criteria)
+        contacts, total = self._search_contacts_uncached(criteria)
+        if total is not None:
+            if single_word and total <= len(contacts):
+                self._insert_word(cache_key, contacts)
+            if len(self._search_cache) >= SEARCH_CACHE_SIZE:
+                # Drop the oldest entry (dicts keep insertion order)
+                self._search_cache.pop(next(iter(self._search_cache)), None)
+            self._search_cache.pop(cache_key, None)
+            self._search_cache[cache_key] = (time.monotonic(), contacts)
+            self._index_contacts(contacts, email_search='@' in criteria, complete=total <= len(contacts))
+        return list(contacts)
+
+    def _insert_word(self, word: str, contacts: List[Dict[str, Any]]):
+        """Remember the complete result for a single-word search"""
+        self._word_count += 1
+        if self._word_count > SEARCH_CACHE_SIZE:
+            # Simple bound - start over rather than track per-word age
+            self._word_trie.clear()
+            self._word_count = 1
+        node = self._word_trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = (time.monotonic(), contacts)
+
+    def _lookup_word_prefix(self, word: str) -> Optional[List[Dict[str, Any]]]:
+        """Return the held result of the longest fresh stored word that is a
+        prefix of word, or None"""
+        node, found = self._word_trie, None
+        now = time.monotonic()
+        for char in word:
+            node = node.get(char)
+            if node is None:
+                break
+            entry = node.get('')
+            if entry and now - entry[0] < SEARCH_CACHE_TTL:
+                found = entry[1]
+        return found
+
+    def _index_contacts(self, contacts: List[Dict[str, Any]], email_search: bool, complete: bool):
+        """Record search results under their exact email, full name and phone keys.
+
+        Email and name keys are only trusted from a complete (untruncated) result
+        of the same kind of search - every contact sharing that email/name is then
+        guaranteed to be in it. Phones can't be searched remotely at all, so any
+        result is better than nothing."""
+        groups: Dict[str, List[Dict[str, Any]]] = {}
+        for contact in contacts:
+            keys = [contact_index_key(phone.get('phoneNumber', '')) for phone in contact.get('phoneNumberData') or []]
+            if complete:
+                keys.append(contact_index_key(contact.get('emailAddress') if email_search else contact.get('name')))
+            for key in keys:
+                if key:
+                    groups.setdefault(key, []).append(contact)
+
+        now = time.monotonic()
+        for key, group in groups.items():
+            if key not in self._contact_index and len(self._contact_index) >= SEARCH_CACHE_SIZE:
+                self._contact_index.pop(next(iter(self._contact_index)), None)
+            self._contact_index[key] = (now, group)
+
+    def _search_contacts_uncached(self, criteria: str) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """Fixed contact search using correct EspoCRM URL parameter format and field names.
+        Returns (contacts, total) - total is None when the CRM call failed"""
         try:
             logger.info(f"Searching for: '{criteria}' using URL parameter WHERE format")
             
@@ -65,26 +310,27 @@ class CRMManager:
             full_url = f"{self.espocrm_url}/Contact"
             logger.info(f"Making request to: {full_url}")
             
-            response = requests.get(full_url, params=params, headers=self.headers, timeout=10)
+            response = self.session.get(full_url, params=params, headers=self.headers, timeout=10)
             
             logger.info(f"Response status: {response.status_code}")
             
             if response.status_code == 200:
-                data = response.json()
+                data = _json.loads(response.content)
                 contacts = data.get("list", [])
                 total = data.get("total", len(contacts))
                 
                 logger.info(f"API returned {len(contacts)} contacts (total: {total})")
-                return contacts
+                return contacts, total
                 
             else:
                 logger.error(f"CRM search failed: {response.status_code} - {response.text}")
-                return []
+                return [], None
                 
         except Exception as e:
             logger.error(f"Search error: {e}")
-            return []
+            return [], None
 
+    @_invalidates_search_cache
     def update_contact_simple(self, contact_id: str, updates: Dict[str, Any]) -> Tuple[bool, str]:
         """Simple contact update with detailed debugging and EspoCRM phoneNumberData support for MULTIPLE phones"""
         try:
@@ -127,7 +373,7 @@ class CRMManager:
                         phone_num = phone_entry.get('phoneNumber', '')
                         if phone_num:
                             # Clean and format the phone number
-                            digits_only = re.sub(r'[^\d]', '', str(phone_num))
+                            digits_only = strip_non_digits(str(phone_num))
                             if len(digits_only) == 10:
                                 formatted_phone = f"+1{digits_only}"
                             elif len(digits_only) == 11 and digits_only.startswith('1'):
@@ -150,8 +396,8 @@ class CRMManager:
                     if formatted_phone_data:
                         # Send all phones at once via phoneNumberData
                         phone_update = {'phoneNumberData': formatted_phone_data}
-                        response = requests.put(f"{self.espocrm_url}/Contact/{contact_id}",
-                                              json=phone_update, headers=self.headers, timeout=10)
+                        response = self.session.put(f"{self.espocrm_url}/Contact/{contact_id}",
+                                              data=_json.dumps(phone_update), headers=self.headers, timeout=10)
 
                         if response.status_code in [200, 204]:
                             phone_update_success = True
@@ -167,7 +413,8 @@ class CRMManager:
                 elif 'phoneNumber' in updates:
                     phone_value = updates.get('phoneNumber', '')
                     if phone_value:
-                        working_format, result_msg = test_phone_formats_with_crm(phone_value, contact_id, self.espocrm_url, self.headers)
+                        working_format, result_msg = test_phone_formats_with_crm(phone_value, contact_id, self.espocrm_url, self.headers,
+                                                                               http=self.session)
 
                         if working_format:
                             logger.info(f"Found working phone format: {working_format}")
@@ -224,8 +471,8 @@ class CRMManager:
                     if formatted_email_data:
                         # Send all emails at once via emailAddressData
                         email_update = {'emailAddressData': formatted_email_data}
-                        response = requests.put(f"{self.espocrm_url}/Contact/{contact_id}",
-                                              json=email_update, headers=self.headers, timeout=10)
+                        response = self.session.put(f"{self.espocrm_url}/Contact/{contact_id}",
+                                              data=_json.dumps(email_update), headers=self.headers, timeout=10)
 
                         if response.status_code in [200, 204]:
                             email_update_success = True
@@ -242,8 +489,8 @@ class CRMManager:
                     email_value = updates.get('emailAddress', '')
                     if email_value and '@' in email_value:
                         email_update = {'emailAddress': email_value.strip().lower()}
-                        response = requests.put(f"{self.espocrm_url}/Contact/{contact_id}",
-                                              json=email_update, headers=self.headers, timeout=10)
+                        response = self.session.put(f"{self.espocrm_url}/Contact/{contact_id}",
+                                              data=_json.dumps(email_update), headers=self.headers, timeout=10)
 
                         if response.status_code in [200, 204]:
                             email_update_success = True
@@ -256,7 +503,7 @@ class CRMManager:
                         email_update_msg = "Invalid email address provided"
 
             # For non-phone/email updates, proceed with normal update
-            clean_updates = {k: v for k, v in updates.items() if k not in ['phoneNumber', 'phoneNumberData', 'emailAddress', 'emailAddressData']}
+            clean_updates = {k: v for k, v in updates.items() if k not in _PHONE_EMAIL_KEYS}
 
             # Validate that we have the contact ID
             if not contact_id:
@@ -269,8 +516,8 @@ class CRMManager:
 
             if clean_updates:
                 logger.info(f"Updating other fields: {list(clean_updates.keys())}")
-                response = requests.put(f"{self.espocrm_url}/Contact/{contact_id}",
-                                      json=clean_updates, headers=self.headers, timeout=10)
+                response = self.session.put(f"{self.espocrm_url}/Contact/{contact_id}",
+                                      data=_json.dumps(clean_updates), headers=self.headers, timeout=10)
 
                 logger.info(f"CRM Response Status: {response.status_code}")
 
@@ -278,7 +525,7 @@ class CRMManager:
                     logger.error(f"CRM Response Error: {response.text}")
 
                     try:
-                        error_data = response.json()
+                        error_data = _json.loads(response.content)
                         logger.error(f"CRM Error Details: {error_data}")
                         other_fields_msg = f"Other fields update failed: CRM Error {response.status_code}: {error_data}"
                     except:
@@ -289,11 +536,11 @@ class CRMManager:
                     other_fields_msg = f"Updated fields: {', '.join(clean_updates.keys())}"
 
             # Combine results
-            all_messages = [phone_update_msg, email_update_msg, other_fields_msg]
+            # Empty messages drop out of the join, so an empty result means no updates
+            combined_msg = " | ".join(filter(None, (phone_update_msg, email_update_msg, other_fields_msg)))
             any_success = phone_update_success or email_update_success or other_fields_success
 
-            if any(all_messages):
-                combined_msg = " | ".join(filter(None, all_messages))
+            if combined_msg:
                 return any_success, combined_msg
             else:
                 logger.error("No updates provided!")
@@ -312,6 +559,7 @@ class CRMManager:
             logger.error(error_msg)
             return False, error_msg
 
+    @_invalidates_search_cache
     def create_contact(self, **kwargs) -> Tuple[str, Optional[str]]:
         """Create contact with validation - FIXED to use phoneNumberData for creation (per EspoCRM docs)"""
         if not kwargs.get('firstName') or not kwargs.get('lastName'):
@@ -330,7 +578,7 @@ class CRMManager:
                         original_phone = phone_entry.get('phoneNumber', '')
                         
                         if original_phone:
-                            digits_only = re.sub(r'[^\d]', '', original_phone)
+                            digits_only = strip_non_digits(original_phone)
                             logger.info(f"🔍 PHONE FORMAT TEST: Original='{original_phone}', Digits='{digits_only}'")
 
                             # Use international format (+1XXXXXXXXXX) since phoneNumberInternational=true in CRM config
@@ -365,15 +613,15 @@ class CRMManager:
         logger.info(f"🔍 CREATE_CONTACT: Final contact_data being sent to CRM: {contact_data}")
         
         try:
-            response = requests.post(f"{self.espocrm_url}/Contact", 
-                                   json=contact_data, headers=self.headers, timeout=10)
+            response = self.session.post(f"{self.espocrm_url}/Contact", 
+                                   data=_json.dumps(contact_data), headers=self.headers, timeout=10)
             
             name = f"{kwargs.get('firstName', '')} {kwargs.get('lastName', '')}".strip()
             
             logger.info(f"🔍 CREATE_CONTACT: CRM response status: {response.status_code}")
             
             if response.status_code in [200, 201]:
-                created_contact = response.json()
+                created_contact = _json.loads(response.content)
                 logger.info(f"✅ CREATE_CONTACT: Successfully created contact: {name}")
                 return f"✅ Successfully created contact: **{name}**", created_contact.get('id')
             elif response.status_code == 409:
@@ -401,7 +649,7 @@ class CRMManager:
                         # Prepare update data (exclude firstName/lastName to avoid conflicts)
                         update_data = {}
                         for key, value in contact_data.items():
-                            if key not in ['firstName', 'lastName', 'emailAddress'] and value:
+                            if key not in _CONFLICT_SKIP_KEYS and value:
                                 update_data[key] = value
                                 logger.info(f"🔍 CONFLICT: Added to update_data: {key} = {value}")
                         
@@ -440,17 +688,17 @@ class CRMManager:
                     phone_data_to_add = contact_data.get('phoneNumberData')
 
                     # Create contact without phone - remove BOTH phoneNumberData AND phoneNumber
-                    contact_data_no_phone = {k: v for k, v in contact_data.items() if k not in ['phoneNumberData', 'phoneNumber']}
+                    contact_data_no_phone = {k: v for k, v in contact_data.items() if k not in _PHONE_KEYS}
 
                     logger.info(f"🔍 RETRY: Contact data WITHOUT phone (should have email): {contact_data_no_phone}")
 
-                    retry_response = requests.post(f"{self.espocrm_url}/Contact",
-                                                 json=contact_data_no_phone, headers=self.headers, timeout=10)
+                    retry_response = self.session.post(f"{self.espocrm_url}/Contact",
+                                                 data=_json.dumps(contact_data_no_phone), headers=self.headers, timeout=10)
 
                     logger.info(f"🔍 RETRY: Response status: {retry_response.status_code}")
 
                     if retry_response.status_code in [200, 201]:
-                        created_contact = retry_response.json()
+                        created_contact = _json.loads(retry_response.content)
                         contact_id = created_contact.get('id')
                         logger.info(f"✅ CREATE_CONTACT: Created without phone: {name} (ID: {contact_id})")
 
@@ -507,8 +755,8 @@ class CRMManager:
             
             logger.info(f"Adding stream note with data: {note_data}")
             
-            response = requests.post(f"{self.espocrm_url}/Note", 
-                                   json=note_data, headers=self.headers, timeout=10)
+            response = self.session.post(f"{self.espocrm_url}/Note", 
+                                   data=_json.dumps(note_data), headers=self.headers, timeout=10)
             
             logger.info(f"Add note response status: {response.status_code}")
             
@@ -535,13 +783,13 @@ class CRMManager:
             logger.info(f"Getting stream notes for contact {contact_id} using Stream API")
             
             # Use the Stream API endpoint: GET Contact/{id}/stream
-            response = requests.get(f"{self.espocrm_url}/Contact/{contact_id}/stream", 
+            response = self.session.get(f"{self.espocrm_url}/Contact/{contact_id}/stream", 
                                   params=params, headers=self.headers, timeout=10)
             
             logger.info(f"Stream API response status: {response.status_code}")
             
             if response.status_code == 200:
-                data = response.json()
+                data = _json.loads(response.content)
                 stream_records = data.get("list", [])
                 
                 logger.info(f"Found {len(stream_records)} stream records")
@@ -593,28 +841,29 @@ class CRMManager:
         try:
             if contact_name:
                 # If searching for a specific contact, get their stream first
-                contacts = self.search_contacts_simple(contact_name)
-                if not contacts:
+                contact = self.find_contact(contact_name)
+                if not contact:
                     return f"❌ Contact '{contact_name}' not found."
                 
-                contact_id = contacts[0]['id']
+                contact_id = contact['id']
                 logger.info(f"Searching notes for specific contact: {contact_name} (ID: {contact_id})")
                 
                 # Get the contact's stream
                 params = {"maxSize": 100, "offset": 0}
-                response = requests.get(f"{self.espocrm_url}/Contact/{contact_id}/stream", 
+                response = self.session.get(f"{self.espocrm_url}/Contact/{contact_id}/stream", 
                                       params=params, headers=self.headers, timeout=10)
                 
                 if response.status_code == 200:
-                    data = response.json()
+                    data = _json.loads(response.content)
                     stream_records = data.get("list", [])
                     
                     # Filter for posts that contain the search term
+                    search_lower = search_term.lower()
                     matching_notes = []
                     for record in stream_records:
                         if (record.get('type') == 'Post' and 
                             record.get('post') and 
-                            search_term.lower() in record.get('post', '').lower()):
+                            search_lower in record.get('post', '').lower()):
                             matching_notes.append(record)
                     
                     if not matching_notes:
@@ -641,19 +890,20 @@ class CRMManager:
                 logger.info(f"Searching all stream notes for term: {search_term}")
                 
                 params = {"maxSize": 100, "offset": 0}
-                response = requests.get(f"{self.espocrm_url}/Stream", 
+                response = self.session.get(f"{self.espocrm_url}/Stream", 
                                       params=params, headers=self.headers, timeout=10)
                 
                 if response.status_code == 200:
-                    data = response.json()
+                    data = _json.loads(response.content)
                     stream_records = data.get("list", [])
                     
                     # Filter for posts that contain the search term and are related to contacts
+                    search_lower = search_term.lower()
                     matching_notes = []
                     for record in stream_records:
                         if (record.get('type') == 'Post' and 
                             record.get('post') and 
-                            search_term.lower() in record.get('post', '').lower() and
+                            search_lower in record.get('post', '').lower() and
                             record.get('parentType') == 'Contact'):
                             matching_notes.append(record)
                     
@@ -688,62 +938,43 @@ class CRMManager:
     def get_contact_details(self, contact_id: str) -> str:
         """Get detailed contact information"""
         try:
-            response = requests.get(f"{self.espocrm_url}/Contact/{contact_id}", 
+            response = self.session.get(f"{self.espocrm_url}/Contact/{contact_id}", 
                                   headers=self.headers, timeout=10)
             
             if response.status_code != 200:
                 return f"❌ Failed to get contact details: {response.status_code}"
             
-            contact = response.json()
+            contact = _json.loads(response.content)
             actual_name = contact.get('name', 'Unknown')
             
-            result_text = f"**Contact Details: {actual_name}**\n\n"
-            
-            fields = [
-                ('Email', 'emailAddressData'),
-                ('Phone', 'phoneNumberData'),
-                ('Title', 'cCurrentTitle'),
-                ('Current Company', 'cCurrentCompany'),
-                ('Skills', 'cSkills'),
-                ('LinkedIn', 'cLinkedInURL'),
-                ('Street Address', 'addressStreet'),
-                ('City', 'addressCity'),
-                ('State', 'addressState'),
-                ('Postal Code', 'addressPostalCode'),
-                ('Country', 'addressCountry'),
-                ('Created', 'createdAt'),
-                ('Modified', 'modifiedAt')
-            ]
+            parts = [f"**Contact Details: {actual_name}**\n\n"]
 
-            for label, field in fields:
-                if contact.get(field):
-                    if field == 'phoneNumberData':
-                        # Handle phone number data structure (multiple phones)
-                        phone_data = contact[field]
-                        if isinstance(phone_data, list) and len(phone_data) > 0:
-                            result_text += f"**{label}:**\n"
-                            for phone_entry in phone_data:
-                                phone_num = phone_entry.get('phoneNumber', '')
-                                phone_type = phone_entry.get('type', 'Unknown')
-                                is_primary = phone_entry.get('primary', False)
-                                primary_text = " (Primary)" if is_primary else ""
-                                result_text += f"  • {phone_num} ({phone_type}){primary_text}\n"
-                    elif field == 'emailAddressData':
-                        # Handle email address data structure (multiple emails)
-                        email_data = contact[field]
-                        if isinstance(email_data, list) and len(email_data) > 0:
-                            result_text += f"**{label}:**\n"
-                            for email_entry in email_data:
-                                email_addr = email_entry.get('emailAddress', '')
-                                is_primary = email_entry.get('primary', False)
-                                is_optout = email_entry.get('optOut', False)
-                                primary_text = " (Primary)" if is_primary else ""
-                                optout_text = " [Opted Out]" if is_optout else ""
-                                result_text += f"  • {email_addr}{primary_text}{optout_text}\n"
-                    else:
-                        result_text += f"**{label}:** {contact[field]}\n"
-            
-            return result_text
+            for label, field in _CONTACT_DETAIL_FIELDS:
+                value = contact.get(field)
+                if not value:
+                    continue
+                if field == 'phoneNumberData':
+                    # Handle phone number data structure (multiple phones)
+                    if isinstance(value, list):
+                        parts.append(f"**{label}:**\n")
+                        for phone_entry in value:
+                            phone_num = phone_entry.get('phoneNumber', '')
+                            phone_type = phone_entry.get('type', 'Unknown')
+                            primary_text = " (Primary)" if phone_entry.get('primary', False) else ""
+                            parts.append(f"  • {phone_num} ({phone_type}){primary_text}\n")
+                elif field == 'emailAddressData':
+                    # Handle email address data structure (multiple emails)
+                    if isinstance(value, list):
+                        parts.append(f"**{label}:**\n")
+                        for email_entry in value:
+                            email_addr = email_entry.get('emailAddress', '')
+                            primary_text = " (Primary)" if email_entry.get('primary', False) else ""
+                            optout_text = " [Opted Out]" if email_entry.get('optOut', False) else ""
+                            parts.append(f"  • {email_addr}{primary_text}{optout_text}\n")
+                else:
+                    parts.append(f"**{label}:** {value}\n")
+
+            return ''.join(parts)
             
         except Exception as e:
             return f"❌ Error getting contact details: {str(e)}"
@@ -757,33 +988,33 @@ class CRMManager:
                 "orderBy": "name"
             }
             
-            response = requests.get(f"{self.espocrm_url}/Contact", 
+            response = self.session.get(f"{self.espocrm_url}/Contact", 
                                   params=params, headers=self.headers, timeout=10)
             
             if response.status_code == 200:
-                data = response.json()
+                data = _json.loads(response.content)
                 contacts = data.get("list", [])
                 total = data.get("total", len(contacts))
                 
                 if not contacts:
                     return "No contacts found in the system."
                 
-                result_text = f"**Contacts ({len(contacts)} of {total} total):**\n\n"
+                parts = [f"**Contacts ({len(contacts)} of {total} total):**\n\n"]
                 
                 for contact in contacts:
-                    result_text += f"• **{contact.get('name', 'Unknown')}**"
+                    parts.append(f"• **{contact.get('name', 'Unknown')}**")
                     if contact.get('emailAddress'):
-                        result_text += f" - {contact['emailAddress']}"
+                        parts.append(f" - {contact['emailAddress']}")
                     if contact.get('cCurrentTitle'):
-                        result_text += f" ({contact['cCurrentTitle']})"
+                        parts.append(f" ({contact['cCurrentTitle']})")
                     if contact.get('cCurrentCompany'):
-                        result_text += f" at {contact['cCurrentCompany']}"
-                    result_text += "\n"
+                        parts.append(f" at {contact['cCurrentCompany']}")
+                    parts.append("\n")
                 
                 if len(contacts) < total:
-                    result_text += f"\n... and {total - len(contacts)} more contacts (use pagination to see more)"
+                    parts.append(f"\n... and {total - len(contacts)} more contacts (use pagination to see more)")
                 
-                return result_text
+                return ''.join(parts)
             else:
                 return f"❌ Failed to list contacts: {response.status_code}"
                 
@@ -793,7 +1024,25 @@ class CRMManager:
     # ACCOUNT MANAGEMENT METHODS
     
     def search_accounts(self, criteria: str) -> List[Dict[str, Any]]:
-        """Search for accounts in the CRM"""
+        """Account search with a short-lived cache in front of the CRM query"""
+        cache_key = (criteria or '').strip().lower()
+        cached = self._account_cache.get(cache_key)
+        if cached and time.monotonic() - cached[0] < ACCOUNT_CACHE_TTL:
+            logger.info("🔍 ACCOUNT CACHE HIT: '%s'", criteria)
+            return list(cached[1])
+
+        accounts = self._search_accounts_uncached(criteria)
+        if accounts is None:
+            return []
+        if len(self._account_cache) >= ACCOUNT_CACHE_SIZE:
+            # Drop the oldest entry (dicts keep insertion order)
+            self._account_cache.pop(next(iter(self._account_cache)), None)
+        self._account_cache.pop(cache_key, None)
+        self._account_cache[cache_key] = (time.monotonic(), accounts)
+        return list(accounts)
+
+    def _search_accounts_uncached(self, criteria: str) -> Optional[List[Dict[str, Any]]]:
+        """Search for accounts in the CRM; None if the query failed"""
         try:
             logger.info(f"Searching accounts for: '{criteria}'")
             
@@ -825,22 +1074,23 @@ class CRMManager:
                     "where[0][value]": criteria
                 })
             
-            response = requests.get(f"{self.espocrm_url}/Account", 
+            response = self.session.get(f"{self.espocrm_url}/Account", 
                                   params=params, headers=self.headers, timeout=10)
             
             if response.status_code == 200:
-                data = response.json()
+                data = _json.loads(response.content)
                 accounts = data.get("list", [])
                 logger.info(f"Found {len(accounts)} accounts")
                 return accounts
             else:
                 logger.error(f"Account search failed: {response.status_code}")
-                return []
+                return None
                 
         except Exception as e:
             logger.error(f"Account search error: {e}")
-            return []
+            return None
 
+    @_invalidates_account_cache
     def create_account(self, **kwargs) -> Tuple[str, Optional[str]]:
         """Create a new account - ENHANCED with better error handling"""
         if not kwargs.get('name'):
@@ -860,8 +1110,8 @@ class CRMManager:
         logger.info(f"Final account_data being sent: {account_data}")
         
         try:
-            response = requests.post(f"{self.espocrm_url}/Account", 
-                                   json=account_data, headers=self.headers, timeout=10)
+            response = self.session.post(f"{self.espocrm_url}/Account", 
+                                   data=_json.dumps(account_data), headers=self.headers, timeout=10)
             
             name = kwargs.get('name', 'Unknown')
             
@@ -869,19 +1119,20 @@ class CRMManager:
             logger.info(f"Account creation response text: {response.text}")
             
             if response.status_code in [200, 201]:
-                created_account = response.json()
+                created_account = _json.loads(response.content)
                 logger.info(f"Successfully created account: {name}")
                 return f"✅ Successfully created account: **{name}**", created_account.get('id')
             elif response.status_code == 409:
                 # Account already exists
                 logger.info(f"Account {name} already exists")
-                existing = self.search_accounts(name)
+                # Bypass the cache - an earlier miss for this name may be stale
+                existing = self._search_accounts_uncached(name)
                 account_id = existing[0]['id'] if existing else None
                 return f"ℹ️ Account **{name}** already exists", account_id
             elif response.status_code == 400:
                 # Bad request - likely validation error
                 try:
-                    error_data = response.json()
+                    error_data = _json.loads(response.content)
                     logger.error(f"Account validation error: {error_data}")
                     return f"❌ Validation error creating account: {error_data}", None
                 except:
@@ -910,13 +1161,13 @@ class CRMManager:
     def get_account_details(self, account_id: str) -> str:
         """Get detailed account information"""
         try:
-            response = requests.get(f"{self.espocrm_url}/Account/{account_id}", 
+            response = self.session.get(f"{self.espocrm_url}/Account/{account_id}", 
                                   headers=self.headers, timeout=10)
             
             if response.status_code != 200:
                 return f"❌ Failed to get account details: {response.status_code}"
             
-            account = response.json()
+            account = _json.loads(response.content)
             name = account.get('name', 'Unknown')
             
             result_text = f"**🏢 Account Details: {name}**\n\n"
@@ -979,6 +1230,7 @@ class CRMManager:
         except Exception as e:
             return f"❌ Error getting account details: {str(e)}"
 
+    @_invalidates_account_cache
     def update_account(self, account_id: str, updates: Dict[str, Any]) -> Tuple[bool, str]:
         """Update account information - ENHANCED based on EspoCRM docs"""
         try:
@@ -995,8 +1247,8 @@ class CRMManager:
             logger.info(f"Clean updates being sent: {clean_updates}")
             
             # Use PUT method as specified in EspoCRM docs
-            response = requests.put(f"{self.espocrm_url}/Account/{account_id}", 
-                                  json=clean_updates, headers=self.headers, timeout=10)
+            response = self.session.put(f"{self.espocrm_url}/Account/{account_id}", 
+                                  data=_json.dumps(clean_updates), headers=self.headers, timeout=10)
             
             logger.info(f"Account update response status: {response.status_code}")
             logger.info(f"Account update response: {response.text}")
@@ -1010,7 +1262,7 @@ class CRMManager:
                 return False, "Permission denied: Check API user permissions for Account updates"
             elif response.status_code == 400:
                 try:
-                    error_data = response.json()
+                    error_data = _json.loads(response.content)
                     return False, f"Validation error: {error_data}"
                 except:
                     return False, f"Bad request: {response.text}"
@@ -1032,33 +1284,33 @@ class CRMManager:
                 "orderBy": "name"
             }
             
-            response = requests.get(f"{self.espocrm_url}/Account", 
+            response = self.session.get(f"{self.espocrm_url}/Account", 
                                   params=params, headers=self.headers, timeout=10)
             
             if response.status_code == 200:
-                data = response.json()
+                data = _json.loads(response.content)
                 accounts = data.get("list", [])
                 total = data.get("total", len(accounts))
                 
                 if not accounts:
                     return "No accounts found in the system."
                 
-                result_text = f"**🏢 Accounts ({len(accounts)} of {total} total):**\n\n"
+                parts = [f"**🏢 Accounts ({len(accounts)} of {total} total):**\n\n"]
                 
                 for account in accounts:
-                    result_text += f"• **{account.get('name', 'Unknown')}**"
+                    parts.append(f"• **{account.get('name', 'Unknown')}**")
                     if account.get('industry'):
-                        result_text += f" ({account['industry']})"
+                        parts.append(f" ({account['industry']})")
                     if account.get('billingAddressCity') and account.get('billingAddressState'):
-                        result_text += f" - {account['billingAddressCity']}, {account['billingAddressState']}"
+                        parts.append(f" - {account['billingAddressCity']}, {account['billingAddressState']}")
                     if account.get('website'):
-                        result_text += f" - {account['website']}"
-                    result_text += "\n"
+                        parts.append(f" - {account['website']}")
+                    parts.append("\n")
                 
                 if len(accounts) < total:
-                    result_text += f"\n... and {total - len(accounts)} more accounts"
+                    parts.append(f"\n... and {total - len(accounts)} more accounts")
                 
-                return result_text
+                return ''.join(parts)
             else:
                 return f"❌ Failed to list accounts: {response.status_code}"
                 
@@ -1071,10 +1323,9 @@ class CRMManager:
         """Link a contact to an account using EspoCRM relationship fields"""
         try:
             # Find contact
-            contacts = self.search_contacts_simple(contact_name)
-            if not contacts:
+            contact = self.find_contact(contact_name)
+            if not contact:
                 return f"❌ Contact '{contact_name}' not found"
-            contact = contacts[0]
             contact_id = contact['id']
             
             # Find account  
@@ -1106,9 +1357,9 @@ class CRMManager:
                 # This typically requires a different API endpoint
                 try:
                     # Use the relationship API endpoint
-                    response = requests.post(
+                    response = self.session.post(
                         f"{self.espocrm_url}/Contact/{contact_id}/accounts",
-                        json={"id": account_id},
+                        data=_json.dumps({"id": account_id}),
                         headers=self.headers,
                         timeout=10
                     )
@@ -1128,10 +1379,10 @@ class CRMManager:
         """Remove contact-account relationship"""
         try:
             # Find contact
-            contacts = self.search_contacts_simple(contact_name)
-            if not contacts:
+            contact = self.find_contact(contact_name)
+            if not contact:
                 return f"❌ Contact '{contact_name}' not found"
-            contact_id = contacts[0]['id']
+            contact_id = contact['id']
             
             if account_name:
                 # Remove from specific account (Many-to-Many)
@@ -1141,7 +1392,7 @@ class CRMManager:
                 account_id = accounts[0]['id']
                 
                 try:
-                    response = requests.delete(
+                    response = self.session.delete(
                         f"{self.espocrm_url}/Contact/{contact_id}/accounts/{account_id}",
                         headers=self.headers,
                         timeout=10
@@ -1177,10 +1428,9 @@ class CRMManager:
         """Get all accounts associated with a contact"""
         try:
             # Find contact
-            contacts = self.search_contacts_simple(contact_name)
-            if not contacts:
+            contact = self.find_contact(contact_name)
+            if not contact:
                 return f"❌ Contact '{contact_name}' not found"
-            contact = contacts[0]
             contact_id = contact['id']
             
             result = f"**🏢 Accounts for {contact_name}:**\n\n"
@@ -1196,14 +1446,14 @@ class CRMManager:
             
             # Get associated accounts (Many-to-Many)
             try:
-                response = requests.get(
+                response = self.session.get(
                     f"{self.espocrm_url}/Contact/{contact_id}/accounts",
                     headers=self.headers,
                     timeout=10
                 )
                 
                 if response.status_code == 200:
-                    data = response.json()
+                    data = _json.loads(response.content)
                     accounts = data.get("list", [])
                     
                     if accounts:
@@ -1231,6 +1481,9 @@ class CRMManager:
     
     def get_all_users(self) -> List[Dict[str, Any]]:
         """Get list of all users for calendar operations"""
+        users = self._get_cached_users('calendar')
+        if users is not None:
+            return users
         try:
             params = {
                 "select": "id,name,userName,emailAddress",
@@ -1241,12 +1494,14 @@ class CRMManager:
                 "orderBy": "name"
             }
             
-            response = requests.get(f"{self.espocrm_url}/User", 
+            response = self.session.get(f"{self.espocrm_url}/User", 
                                   params=params, headers=self.headers, timeout=10)
             
             if response.status_code == 200:
-                data = response.json()
-                return data.get("list", [])
+                data = _json.loads(response.content)
+                users = data.get("list", [])
+                self._users_cache['calendar'] = (time.monotonic(), users)
+                return users
             else:
                 logger.error(f"Failed to get users: {response.status_code}")
                 return []
@@ -1257,9 +1512,10 @@ class CRMManager:
     def find_user_by_name(self, user_name: str) -> Optional[str]:
         """Find user ID by name"""
         users = self.get_all_users()
+        user_name_lower = user_name.lower()
         for user in users:
-            if (user.get('name', '').lower() == user_name.lower() or 
-                user.get('userName', '').lower() == user_name.lower()):
+            if (user.get('name', '').lower() == user_name_lower or 
+                user.get('userName', '').lower() == user_name_lower):
                 return user.get('id')
         return None
 
@@ -1313,10 +1569,10 @@ class CRMManager:
             all_events = []
             for endpoint in endpoints_to_try:
                 try:
-                    response = requests.get(f"{self.espocrm_url}/{endpoint}", 
+                    response = self.session.get(f"{self.espocrm_url}/{endpoint}", 
                                           params=params, headers=self.headers, timeout=10)
                     if response.status_code == 200:
-                        data = response.json()
+                        data = _json.loads(response.content)
                         events = data.get("list", [])
                         for event in events:
                             event['_entity_type'] = endpoint  # Track which entity type
@@ -1419,11 +1675,11 @@ class CRMManager:
             
             for endpoint in endpoints_to_try:
                 try:
-                    response = requests.post(f"{self.espocrm_url}/{endpoint}", 
-                                           json=event_data, headers=self.headers, timeout=10)
+                    response = self.session.post(f"{self.espocrm_url}/{endpoint}", 
+                                           data=_json.dumps(event_data), headers=self.headers, timeout=10)
                     
                     if response.status_code in [200, 201]:
-                        created_event = response.json()
+                        created_event = _json.loads(response.content)
                         logger.info(f"Successfully created {endpoint} for user {user_name}")
                         return f"✅ **Calendar event created for {user_name}**\n\n**Event:** {name}\n**Time:** {date_start} - {date_end}\n**Type:** {endpoint}"
                     
@@ -1512,9 +1768,9 @@ class CRMManager:
 
             logger.info(f"Creating attachment with name={filename}, type={mime_type}, relatedType={parent_type}, field={field_name}")
 
-            create_response = requests.post(
+            create_response = self.session.post(
                 f"{self.espocrm_url}/Attachment",
-                json=attachment_payload,
+                data=_json.dumps(attachment_payload),
                 headers=self.headers,
                 timeout=60  # Longer timeout for large files
             )
@@ -1525,7 +1781,7 @@ class CRMManager:
                 logger.error(f"Attachment creation failed: {create_response.status_code} - {create_response.text}")
                 return False, f"Failed to create attachment: {create_response.status_code}"
 
-            attachment_result = create_response.json()
+            attachment_result = _json.loads(create_response.content)
             attachment_id = attachment_result.get('id')
             logger.info(f"Attachment created with ID: {attachment_id}")
 
@@ -1536,9 +1792,9 @@ class CRMManager:
 
             logger.info(f"Linking attachment {attachment_id} to {parent_type} {parent_id}.{field_name}")
 
-            link_response = requests.put(
+            link_response = self.session.put(
                 f"{self.espocrm_url}/{parent_type}/{parent_id}",
-                json=update_payload,
+                data=_json.dumps(update_payload),
                 headers=self.headers,
                 timeout=10
             )
@@ -1561,6 +1817,9 @@ class CRMManager:
 
     def get_all_users_for_tasks(self) -> List[Dict[str, Any]]:
         """Get list of all active users for task assignment"""
+        users = self._get_cached_users('tasks')
+        if users is not None:
+            return users
         try:
             params = {
                 "select": "id,name,userName,emailAddress,firstName,lastName",
@@ -1570,15 +1829,16 @@ class CRMManager:
                 "orderBy": "name"
             }
 
-            response = requests.get(f"{self.espocrm_url}/User",
+            response = self.session.get(f"{self.espocrm_url}/User",
                                   params=params, headers=self.headers, timeout=10)
 
             if response.status_code == 200:
-                data = response.json()
+                data = _json.loads(response.content)
                 users = data.get("list", [])
                 # Filter out system users
-                users = [u for u in users if u.get('userName') not in ['system', 'backupadmin']]
+                users = [u for u in users if u.get('userName') not in _HIDDEN_USERNAMES]
                 logger.info(f"Found {len(users)} active users for task assignment")
+                self._users_cache['tasks'] = (time.monotonic(), users)
                 return users
             else:
                 logger.error(f"Failed to get users: {response.status_code}")
@@ -1686,9 +1946,8 @@ class CRMManager:
             # Link to contact if specified
             contact_info = ""
             if related_contact:
-                contacts = self.search_contacts_simple(related_contact)
-                if contacts:
-                    contact = contacts[0]
+                contact = self.find_contact(related_contact)
+                if contact:
                     task_data["parentId"] = contact['id']
                     task_data["parentType"] = "Contact"
                     task_data["contactId"] = contact['id']
@@ -1696,11 +1955,11 @@ class CRMManager:
 
             logger.info(f"Creating task: {task_data}")
 
-            response = requests.post(f"{self.espocrm_url}/Task",
-                                   json=task_data, headers=self.headers, timeout=10)
+            response = self.session.post(f"{self.espocrm_url}/Task",
+                                   data=_json.dumps(task_data), headers=self.headers, timeout=10)
 
             if response.status_code in [200, 201]:
-                created_task = response.json()
+                created_task = _json.loads(response.content)
                 task_id = created_task.get('id')
                 logger.info(f"Task created successfully: {task_id}")
 
@@ -1766,11 +2025,11 @@ class CRMManager:
                 params[f"where[{filter_index}][type]"] = "equals"
                 params[f"where[{filter_index}][value]"] = status_filter
 
-            response = requests.get(f"{self.espocrm_url}/Task",
+            response = self.session.get(f"{self.espocrm_url}/Task",
                                   params=params, headers=self.headers, timeout=10)
 
             if response.status_code == 200:
-                data = response.json()
+                data = _json.loads(response.content)
                 tasks = data.get("list", [])
                 total = data.get("total", len(tasks))
 
@@ -1884,13 +2143,13 @@ class CRMManager:
                     params["where[1][type]"] = "equals"
                     params["where[1][value]"] = user['id']
 
-            response = requests.get(f"{self.espocrm_url}/Task",
+            response = self.session.get(f"{self.espocrm_url}/Task",
                                   params=params, headers=self.headers, timeout=10)
 
             if response.status_code != 200:
                 return f"❌ Failed to search for task: {response.status_code}"
 
-            data = response.json()
+            data = _json.loads(response.content)
             tasks = data.get("list", [])
 
             if not tasks:
@@ -1915,8 +2174,8 @@ class CRMManager:
                 from datetime import datetime
                 update_data["dateCompleted"] = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
 
-            response = requests.put(f"{self.espocrm_url}/Task/{task_id}",
-                                  json=update_data, headers=self.headers, timeout=10)
+            response = self.session.put(f"{self.espocrm_url}/Task/{task_id}",
+                                  data=_json.dumps(update_data), headers=self.headers, timeout=10)
 
             if response.status_code in [200, 204]:
                 status_icons = {
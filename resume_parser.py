@@ -3,36 +3,80 @@
 
 import re
 import json
+import hashlib
 import logging
 from typing import Tuple, Optional, Dict, Any
-import openai
-from utils import format_phone_for_crm, create_phone_number_data
+from utils import search_address
 
 logger = logging.getLogger(__name__)
 
+# Runs of non-ASCII characters and/or whitespace, collapsed to a single space
+# in one pass when cleaning text for fallback parsing
+_GARBLED_OR_SPACE_PATTERN = re.compile(r'(?:[^\x00-\x7F]|\s)+')
+
+# Manual name extraction - honorifics/suffixes to strip, then one pattern
+# covering "First Last", "FIRST LAST" and "First M. Last" lines
+_HONORIFIC_PATTERN = re.compile(r'\b(Mr\.?|Ms\.?|Mrs\.?|Dr\.?)\s+', re.IGNORECASE)
+_NAME_SUFFIX_PATTERN = re.compile(r'\s+(Jr\.?|Sr\.?|II|III)$', re.IGNORECASE)
+_NAME_LINE_PATTERN = re.compile(
+    r'^(?:(?P<first>[A-Z][a-z]{1,20})\s+(?P<last>[A-Z][a-z]{1,20})'
+    r'|(?P<caps_first>[A-Z]{2,20})\s+(?P<caps_last>[A-Z]{2,20})'
+    r'|(?P<middle_first>[A-Z][a-z]{1,20})\s+[A-Z]\.?\s+(?P<middle_last>[A-Z][a-z]{1,20}))$'
+)
+
+# Words that suggest an upload is a resume - plain substring checks on the
+# lowercased text beat a case-insensitive regex alternation here
+_RESUME_KEYWORDS = ('experience', 'education', 'skills', 'employment', 'work',
+                    'resume', 'cv', 'professional', 'career')
+
+# Filename cleanup: the extension and resume-ish words are stripped in one pass
+_FILENAME_NOISE_PATTERN = re.compile(
+    r'\.(?:pdf|docx?|txt)$|\b(?:resume|cv|curriculum|vitae)\b', re.IGNORECASE
+)
+
+# Fallback contact details pulled from cleaned resume text
+_EMAIL_PATTERN = re.compile(r'[\w\.-]+@[\w\.-]+\.\w+')
+_PHONE_PATTERN = re.compile(r'\(?\d{3}\)?[\s\-\.]?\d{3}[\s\-\.]?\d{4}')
+
+# Placeholder names the AI falls back to when it can't find the real one
+_PLACEHOLDER_FIRST_NAMES = frozenset({'unknown', 'resume', 'contact'})
+_PLACEHOLDER_LAST_NAMES = frozenset({'professional', 'unknown', 'contact'})
+
+# Plain text fields copied (stripped) from the AI result
+_TEXT_RESULT_FIELDS = (
+    'cCurrentTitle', 'cCurrentCompany', 'cLinkedInURL',
+    'addressStreet', 'addressCity', 'addressState',
+    'addressPostalCode', 'addressCountry',
+)
+
+# "First Last" at the start of a cleaned-up filename
+_FILENAME_NAME_PATTERN = re.compile(r'^([A-Z][a-z]+)\s+([A-Z][a-z]+)', re.IGNORECASE)
+
+# Parsed results kept for recently seen resumes (re-uploads, retries)
+RESUME_CACHE_SIZE = 32
+
 class ResumeParser:
     def __init__(self, openai_client):
         self.client = openai_client
+        # blake2b(filename + text) -> cleaned extraction result
+        self._cache: Dict[str, Dict[str, Any]] = {}
 
     def extract_name_from_filename(self, filename: str) -> Optional[Tuple[str, str]]:
         """Extract name from filename like 'John_Doe_Resume.pdf' or 'Jane Smith.docx'"""
         if not filename:
             return None
 
-        # Remove file extension
-        name_part = re.sub(r'\.(pdf|docx?|txt)$', '', filename, flags=re.IGNORECASE)
-
-        # Remove common resume-related words
-        name_part = re.sub(r'\b(resume|cv|curriculum|vitae)\b', '', name_part, flags=re.IGNORECASE)
+        # Remove file extension and common resume-related words
+        name_part = _FILENAME_NOISE_PATTERN.sub('', filename)
 
         # Replace underscores and hyphens with spaces
         name_part = name_part.replace('_', ' ').replace('-', ' ')
 
         # Clean up extra spaces
-        name_part = re.sub(r'\s+', ' ', name_part).strip()
+        name_part = ' '.join(name_part.split())
 
         # Try to match "FirstName LastName" pattern
-        name_match = re.match(r'^([A-Z][a-z]+)\s+([A-Z][a-z]+)', name_part, re.IGNORECASE)
+        name_match = _FILENAME_NAME_PATTERN.match(name_part)
         if name_match:
             first = name_match.group(1).capitalize()
             last = name_match.group(2).capitalize()
@@ -62,49 +106,47 @@ class ResumeParser:
             'volunteer', 'leadership', 'memberships', 'presentations', 'patents'
         }
 
-        lines = resume_text.strip().split('\n')
+        # Only the first 10 lines matter - don't split the whole resume
+        lines = resume_text.strip().split('\n', 10)[:10]
 
         # Check first 10 lines for name patterns
-        for line in lines[:10]:
+        for line in lines:
             line = line.strip()
             if not line or len(line) < 3:
                 continue
 
             # Remove common prefixes/suffixes and clean line
-            clean_line = re.sub(r'\b(Mr\.?|Ms\.?|Mrs\.?|Dr\.?)\s+', '', line, flags=re.IGNORECASE)
-            clean_line = re.sub(r'\s+(Jr\.?|Sr\.?|II|III)$', '', clean_line, flags=re.IGNORECASE)
-            clean_line = clean_line.strip()
-
-            # Look for simple "FirstName LastName" pattern (2-20 chars each)
-            name_match = re.match(r'^([A-Z][a-z]{1,20})\s+([A-Z][a-z]{1,20})$', clean_line)
-            if name_match:
-                first, last = name_match.group(1), name_match.group(2)
-                # Validate it's not a skill/section name
-                if first.lower() not in INVALID_NAMES and last.lower() not in INVALID_NAMES:
-                    logger.info(f"Manual extraction validated: {first} {last}")
-                    return first, last
-
-            # Look for "FIRSTNAME LASTNAME" pattern
-            caps_match = re.match(r'^([A-Z]{2,20})\s+([A-Z]{2,20})$', clean_line)
-            if caps_match:
-                first, last = caps_match.group(1).capitalize(), caps_match.group(2).capitalize()
-                if first.lower() not in INVALID_NAMES and last.lower() not in INVALID_NAMES:
-                    logger.info(f"Manual extraction validated (caps): {first} {last}")
-                    return first, last
-
-            # Look for "First Last" with possible middle initial
-            middle_match = re.match(r'^([A-Z][a-z]{1,20})\s+[A-Z]\.?\s+([A-Z][a-z]{1,20})$', clean_line)
-            if middle_match:
-                first, last = middle_match.group(1), middle_match.group(2)
-                if first.lower() not in INVALID_NAMES and last.lower() not in INVALID_NAMES:
-                    logger.info(f"Manual extraction validated (with middle): {first} {last}")
-                    return first, last
+            clean_line = _HONORIFIC_PATTERN.sub('', line)
+            clean_line = _NAME_SUFFIX_PATTERN.sub('', clean_line).strip()
+
+            # "FirstName LastName", "FIRSTNAME LASTNAME" or "First M. Last" (2-20 chars each)
+            name_match = _NAME_LINE_PATTERN.match(clean_line)
+            if not name_match:
+                continue
+
+            if name_match.group('first'):
+                first, last, kind = name_match.group('first'), name_match.group('last'), ""
+            elif name_match.group('caps_first'):
+                first, last, kind = name_match.group('caps_first').capitalize(), name_match.group('caps_last').capitalize(), " (caps)"
+            else:
+                first, last, kind = name_match.group('middle_first'), name_match.group('middle_last'), " (with middle)"
+
+            # Validate it's not a skill/section name
+            if first.lower() not in INVALID_NAMES and last.lower() not in INVALID_NAMES:
+                logger.info(f"Manual extraction validated{kind}: {first} {last}")
+                return first, last
 
         logger.warning("Manual extraction found no valid person names")
         return None
 
     def extract_resume_info(self, resume_text: str, filename: str = None) -> Dict[str, Any]:
         """Extract structured information from resume text with improved parsing"""
+        cache_key = hashlib.blake2b(f"{filename or ''}\0{resume_text}".encode('utf-8', 'replace'), digest_size=16).hexdigest()
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            logger.info("📄 Resume already parsed - reusing cached extraction")
+            return dict(cached)
+
         prompt = f"""
         Please extract the following information from this resume and return it as JSON:
         - firstName: First name only
@@ -179,8 +221,8 @@ class ResumeParser:
             
             # If AI didn't find good names, try manual extraction first
             if (not firstName or not lastName or
-                firstName.lower() in ['unknown', 'resume', 'contact'] or
-                lastName.lower() in ['professional', 'unknown', 'contact']):
+                firstName.lower() in _PLACEHOLDER_FIRST_NAMES or
+                lastName.lower() in _PLACEHOLDER_LAST_NAMES):
 
                 logger.info("AI name extraction poor, trying manual extraction...")
                 manual_names = self.manual_name_extraction(resume_text)
@@ -225,9 +267,7 @@ class ResumeParser:
                 cleaned_result['phoneNumber'] = str(result['phoneNumber']).strip()
                 
             # Clean other fields
-            for field in ['cCurrentTitle', 'cCurrentCompany', 'cLinkedInURL', 
-                         'addressStreet', 'addressCity', 'addressState', 
-                         'addressPostalCode', 'addressCountry']:
+            for field in _TEXT_RESULT_FIELDS:
                 if result.get(field):
                     cleaned_result[field] = str(result[field]).strip()
             
@@ -239,6 +279,11 @@ class ResumeParser:
                     cleaned_result['cSkills'] = str(result['cSkills']).strip()
                     
             logger.info(f"Cleaned result: {cleaned_result}")
+
+            # Only successful AI extractions are cached - fallback parsing is retried
+            if len(self._cache) >= RESUME_CACHE_SIZE:
+                self._cache.pop(next(iter(self._cache)), None)
+            self._cache[cache_key] = dict(cleaned_result)
             return cleaned_result
             
         except Exception as e:
@@ -247,9 +292,8 @@ class ResumeParser:
 
     def _fallback_parsing(self, resume_text: str) -> Dict[str, Any]:
         """Enhanced fallback parsing using regex"""
-        # Clean the text first - remove garbled characters
-        clean_text = re.sub(r'[^\x00-\x7F]+', ' ', resume_text)
-        clean_text = re.sub(r'\s+', ' ', clean_text)
+        # Clean the text first - remove garbled characters and collapse whitespace
+        clean_text = _GARBLED_OR_SPACE_PATTERN.sub(' ', resume_text)
         
         # Try manual extraction first
         manual_names = self.manual_name_extraction(resume_text)
@@ -260,13 +304,13 @@ class ResumeParser:
             lastName = "Person"
         
         # Find email
-        email_match = re.search(r'[\w\.-]+@[\w\.-]+\.\w+', clean_text)
+        email_match = _EMAIL_PATTERN.search(clean_text)
         
         # Find phone number
-        phone_match = re.search(r'\(?\d{3}\)?[\s\-\.]?\d{3}[\s\-\.]?\d{4}', clean_text)
+        phone_match = _PHONE_PATTERN.search(clean_text)
         
         # Find address components
-        address_match = re.search(r'(\d+\s+[^,\n]+),?\s*([^,\n]+),?\s*([A-Z]{2})\s+(\d{5}(?:-\d{4})?)', clean_text)
+        address_match = search_address(clean_text)
         
         result = {
             "firstName": firstName,
@@ -421,7 +465,8 @@ class ResumeParser:
                 logger.info("Content truncated to 10000 characters")
 
             # Basic validation - check if it looks like a resume
-            if not any(keyword in content.lower() for keyword in ['experience', 'education', 'skills', 'employment', 'work', 'resume', 'cv', 'professional', 'career']):
+            content_lower = content.lower()
+            if not any(keyword in content_lower for keyword in _RESUME_KEYWORDS):
                 logger.warning("Content doesn't appear to be a resume")
                 return content, "⚠️ Warning: This doesn't appear to be a resume, but I'll try to process it anyway."
 
@@ -1,15 +1,20 @@
 # security.py
 from functools import wraps
-from flask import request, render_template, redirect, url_for
+from flask import request, render_template_string
 from collections import defaultdict
 from datetime import datetime, timedelta
-import time
+import hmac
 import logging
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Logging is configured by app.py (LOG_LEVEL)
 logger = logging.getLogger(__name__)
 
+try:
+    from templates import LOGIN_TEMPLATE
+except ImportError as e:
+    logger.error(f"Template import error: {e}")
+    LOGIN_TEMPLATE = "Template error - please check templates.py file"
+
 class RateLimiter:
     def __init__(self):
         self.failed_attempts = defaultdict(list)
@@ -55,6 +60,23 @@ class RateLimiter:
 # Global rate limiter instance
 rate_limiter = RateLimiter()
 
+# Honeypot hits always get the same page, so it is rendered only once
+_honeypot_page = None
+
+def honeypot_response():
+    """Return the (cached) generic login error page served to honeypot hits"""
+    global _honeypot_page
+    if _honeypot_page is None:
+        _honeypot_page = render_template_string(LOGIN_TEMPLATE,
+            error="Invalid access token. Please try again.")
+    return _honeypot_page, 429
+
+def verify_token(provided, expected):
+    """Compare an access token in constant time"""
+    if not provided or not expected:
+        return False
+    return hmac.compare_digest(str(provided).encode(), expected.encode())
+
 def check_honeypot(form_data):
     """Check for honeypot field - bots often fill these out"""
     honeypot_fields = ['email', 'website', 'url', 'phone']
@@ -73,29 +95,24 @@ def rate_limit_login(f):
             # Check if IP is blocked
             if rate_limiter.is_ip_blocked(ip):
                 logger.warning(f"Blocked IP attempted login: {ip}")
-                return render_template('login.html', 
-                    error="Too many failed attempts. Please try again in 15 minutes.")
+                return render_template_string(LOGIN_TEMPLATE, 
+                    error="Too many failed attempts. Please try again in 15 minutes."), 429
             
-            # Check honeypot
+            # Check honeypot - count it as a failed attempt and answer right away
+            # rather than holding the worker; repeat offenders get blocked above
             if check_honeypot(request.form):
                 logger.warning(f"Honeypot triggered from IP: {ip}")
                 rate_limiter.add_failed_attempt(ip)
                 # Don't reveal it was a honeypot
-                time.sleep(2)
-                return render_template('login.html', 
-                    error="Invalid access token.")
+                return honeypot_response()
         
         return f(*args, **kwargs)
     return decorated_function
 
 def handle_failed_login(ip):
-    """Handle failed login attempt with progressive delays"""
-    attempt_count = rate_limiter.get_attempt_count(ip)
-    
-    # Progressive delay: 1s, 2s, 4s, 8s (max)
-    if attempt_count > 0:
-        delay = min(2 ** (attempt_count - 1), 8)
-        time.sleep(delay)
+    """Handle failed login attempt"""
+    # No sleep-based tarpit here: it only pinned a worker thread per guess.
+    # Brute forcing is bounded by the lockout after 5 attempts instead
     
     # Add the failed attempt
     is_blocked = rate_limiter.add_failed_attempt(ip)
@@ -525,10 +525,10 @@ ENHANCED_TEMPLATE = '''
                         <div class="file-upload-zone" id="fileUploadZone">
                             <label for="resume_file">
                                 <div class="upload-icon"></div>
-                                <div class="upload-text" id="uploadText">Drop a resume here or click to browse</div>
+                                <div class="upload-text" id="uploadText">Drop resumes here or click to browse</div>
                                 <div class="upload-subtext" id="uploadSubtext">PDF, DOC, DOCX, TXT files supported</div>
                             </label>
-                            <input type="file" id="resume_file" name="resume_file" accept=".pdf,.doc,.docx,.txt,.rtf">
+                            <input type="file" id="resume_file" name="resume_file" accept=".pdf,.doc,.docx,.txt,.rtf" multiple>
                         </div>
                     </form>
                 </div>
@@ -562,6 +562,52 @@ ENHANCED_TEMPLATE = '''
                 messagesWrapper.scrollTop = messagesWrapper.scrollHeight;
             }
         }
+
+        // Stream the reply into the typing bubble via /stream (server-sent events).
+        // Resolves false only if streaming never started, so the caller can fall
+        // back to a normal POST without running the request twice.
+        async function streamMessage(formData) {
+            let res;
+            try {
+                res = await fetch('{{ request.script_root }}/stream', {
+                    method: 'POST',
+                    body: formData,
+                    credentials: 'same-origin'
+                });
+            } catch (err) {
+                return false;
+            }
+            const contentType = res.headers.get('Content-Type') || '';
+            if (!res.ok || !res.body || !contentType.startsWith('text/event-stream')) {
+                return false;
+            }
+
+            const bubble = messagesWrapper.querySelector('.message-assistant.typing .message-bubble');
+            const reader = res.body.getReader();
+            const decoder = new TextDecoder();
+            let buffer = '';
+            let text = '';
+            try {
+                while (true) {
+                    const { value, done } = await reader.read();
+                    if (done) break;
+                    buffer += decoder.decode(value, { stream: true });
+                    let sep;
+                    while ((sep = buffer.indexOf('\\n\\n')) !== -1) {
+                        const event = buffer.slice(0, sep);
+                        buffer = buffer.slice(sep + 2);
+                        if (event.startsWith('data: ')) {
+                            text += JSON.parse(event.slice(6));
+                            if (bubble) bubble.textContent = text;
+                            scrollToBottom();
+                        }
+                    }
+                }
+            } catch (err) {
+                console.error('Stream interrupted:', err);
+            }
+            return true;
+        }
     
         // Initial scroll positioning
         if (messagesWrapper) {
@@ -684,12 +730,20 @@ ENHANCED_TEMPLATE = '''
                 formData.set('prompt', userMessage); // Ensure the message is in formData
                 
                 try {
-                    const res = await fetch(window.location.href, { 
-                        method: 'POST', 
-                        body: formData,
-                        headers: { 'X-Requested-With': 'fetch' },
-                        credentials: 'same-origin'
-                    });
+                    // Stream the reply when possible, then re-render the saved
+                    // conversation; otherwise fall back to a regular POST
+                    const streamed = {{ 'true' if stream_responses else 'false' }} && await streamMessage(formData);
+                    const res = streamed
+                        ? await fetch(window.location.href, {
+                            headers: { 'X-Requested-With': 'fetch' },
+                            credentials: 'same-origin'
+                        })
+                        : await fetch(window.location.href, { 
+                            method: 'POST', 
+                            body: formData,
+                            headers: { 'X-Requested-With': 'fetch' },
+                            credentials: 'same-origin'
+                        });
                     const html = await res.text();
                     
                     // Parse response and replace entire messages wrapper content
@@ -766,20 +820,21 @@ ENHANCED_TEMPLATE = '''
         async function startFileUpload() {
             const f = fileInput.files && fileInput.files[0];
             if (!f) return;
+            const fileNames = Array.from(fileInput.files, file => file.name).join(', ');
     
             // Hide welcome state
             hideWelcomeState();
     
             // Update UI
             fileZone.classList.add('file-selected');
-            if (uploadText) uploadText.textContent = f.name;
+            if (uploadText) uploadText.textContent = fileNames;
             if (uploadSubtext) uploadSubtext.textContent = 'Parsing and creating contact...';
     
             // Add user message about file upload
             const uploadMsgHtml = `
                 <div class="message message-user">
                     <div class="message-label">You</div>
-                    <div class="message-bubble">📎 Uploaded: ${escapeHtml(f.name)}</div>
+                    <div class="message-bubble">📎 Uploaded: ${escapeHtml(fileNames)}</div>
                 </div>
             `;
             messagesWrapper.insertAdjacentHTML('beforeend', uploadMsgHtml);
@@ -2207,3 +2262,165 @@ QUICKEMAIL_TEMPLATE = '''
 </body>
 </html>
 '''
+
+CONTEXT_TEMPLATE = '''
+<!doctype html>
+<html>
+<head>
+    <title>📝 AI Context Notes</title>
+    <meta charset="utf-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1">
+    <style>
+        * { margin: 0; padding: 0; box-sizing: border-box; }
+        body {
+            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
+            background: linear-gradient(135deg, #7C3AED 0%, #A78BFA 100%);
+            min-height: 100vh;
+            padding: 20px;
+        }
+        .container {
+            max-width: 500px;
+            margin: 0 auto;
+            background: white;
+            border-radius: 16px;
+            box-shadow: 0 10px 40px rgba(0,0,0,0.2);
+            overflow: hidden;
+        }
+        .header {
+            background: linear-gradient(135deg, #7C3AED, #A78BFA);
+            color: white;
+            padding: 20px;
+            text-align: center;
+        }
+        .header h1 { font-size: 20px; font-weight: 600; }
+        .header p { font-size: 13px; opacity: 0.9; margin-top: 4px; }
+        .content { padding: 20px; }
+        .form-group { margin-bottom: 16px; }
+        label {
+            display: block;
+            font-size: 12px;
+            font-weight: 600;
+            color: #64748B;
+            margin-bottom: 6px;
+            text-transform: uppercase;
+        }
+        textarea {
+            width: 100%;
+            padding: 12px;
+            border: 2px solid #E2E8F0;
+            border-radius: 8px;
+            font-size: 14px;
+            min-height: 200px;
+            resize: vertical;
+            font-family: inherit;
+            line-height: 1.5;
+        }
+        textarea:focus {
+            outline: none;
+            border-color: #7C3AED;
+        }
+        .btn {
+            width: 100%;
+            padding: 14px;
+            border: none;
+            border-radius: 8px;
+            font-size: 15px;
+            font-weight: 600;
+            cursor: pointer;
+            background: linear-gradient(135deg, #7C3AED, #A78BFA);
+            color: white;
+            margin-bottom: 10px;
+        }
+        .btn:hover {
+            transform: translateY(-1px);
+            box-shadow: 0 4px 12px rgba(124, 58, 237, 0.3);
+        }
+        .success {
+            background: #DCFCE7;
+            color: #166534;
+            padding: 12px;
+            border-radius: 8px;
+            margin-bottom: 16px;
+            text-align: center;
+            font-weight: 500;
+        }
+        .help-text {
+            font-size: 12px;
+            color: #64748B;
+            margin-top: 8px;
+            line-height: 1.5;
+        }
+        .close-btn {
+            display: block;
+            text-align: center;
+            padding: 12px;
+            color: #64748B;
+            text-decoration: none;
+            font-size: 13px;
+        }
+    </style>
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h1>📝 AI Context Notes</h1>
+            <p>Persistent notes the AI always sees when generating emails</p>
+        </div>
+        <div class="content">
+            {% if saved %}
+            <div class="success">✅ Context saved!</div>
+            {% endif %}
+
+            <form method="POST">
+                <div class="form-group">
+                    <label>Context Notes</label>
+                    <textarea name="context" placeholder="Add context the AI should always know about...
+
+Examples:
+• We just released our Winter 2025 newsletter
+• Currently hiring for 3 ML Engineer roles
+• New partnership with TechCorp announced
+• Holiday office closure Dec 23-Jan 2
+• Mention our new AI recruiting tools">{{ current_context }}</textarea>
+                    <p class="help-text">
+                        These notes are included in EVERY email generation. Use for current events,
+                        campaigns, talking points, or anything you want the AI to potentially reference.
+                    </p>
+                </div>
+
+                <button type="submit" class="btn">💾 Save Context</button>
+            </form>
+
+            <a href="javascript:window.close()" class="close-btn">Close Window</a>
+        </div>
+    </div>
+</body>
+</html>
+'''
+
+DEBUG_TEMPLATE = '''
+<html>
+<head><title>EspoCRM AI Copilot Debug</title></head>
+<body style="font-family: Arial, sans-serif; max-width: 800px; margin: 20px auto; padding: 20px;">
+    <h2>🔍 EspoCRM AI Copilot Debug Info</h2>
+
+    <div style="background: #e8f5e8; padding: 15px; border-radius: 5px; margin: 20px 0;">
+        <h3>Session Status</h3>
+        <table style="width: 100%; border-collapse: collapse;">
+            <tr><td><strong>Authenticated:</strong></td><td>{{ authenticated }}</td></tr>
+            <tr><td><strong>History Count:</strong></td><td>{{ history_count }}</td></tr>
+            <tr><td><strong>Last Contact:</strong></td><td>{{ last_contact }}</td></tr>
+        </table>
+    </div>
+
+    <div style="background: #f8f9fa; padding: 15px; border-radius: 5px; margin: 20px 0;">
+        <h3>Architecture</h3>
+        <p><strong>Processing Mode:</strong> AI-First Intelligence</p>
+        <p><strong>Approach:</strong> AI understands intent → Execute simple functions</p>
+        <p><strong>Benefits:</strong> Natural language, context-aware, self-learning</p>
+    </div>
+
+    <p><a href="/">🏠 Main App</a> | <a href="/logout">🚪 Logout</a> | <a href="/reset">🔄 Reset</a></p>
+</body>
+</html>
+'''
@@ -6,11 +6,23 @@ import html
 import logging
 import time
 import requests
+from collections import deque
 from typing import List, Dict, Any, Optional, Tuple
-from flask import session
+from flask import session, g
+
+# orjson is optional - fall back to the stdlib json module if it isn't installed
+try:
+    import orjson as _json
+except ImportError:
+    import json as _json
 
 logger = logging.getLogger(__name__)
 
+# Conversation history is kept in the session as one serialized blob,
+# capped at the most recent MAX_HISTORY messages
+HISTORY_SESSION_KEY = 'conversation_history_json'
+MAX_HISTORY = 30
+
 # Input processing
 def sanitize_input(text):
     """Sanitize user input"""
@@ -19,13 +31,25 @@ def sanitize_input(text):
     return html.escape(str(text).strip())
 
 # Phone number formatting functions
+
+# Deletes every non-digit ASCII character - str.translate is a C-level table
+# lookup, much cheaper than running re.sub(r'[^\d]', ...) for short strings
+_NON_DIGIT_TABLE = str.maketrans('', '', ''.join(chr(c) for c in range(128) if not chr(c).isdigit()))
+
+def strip_non_digits(text: str) -> str:
+    """Return only the digit characters of text"""
+    if text.isascii():
+        return text.translate(_NON_DIGIT_TABLE)
+    # Non-ASCII input keeps Unicode digits, matching the regex behaviour
+    return ''.join(filter(str.isdecimal, text))
+
 def format_phone_for_crm(phone_string: str) -> str:
     """Format phone number for EspoCRM Phone field validation - uses international format (+1XXXXXXXXXX)"""
     if not phone_string:
         return ""
 
     # Extract digits only
-    digits_only = re.sub(r'[^\d]', '', str(phone_string))
+    digits_only = strip_non_digits(str(phone_string))
 
     if len(digits_only) == 10:
         # Return international format with +1 prefix
@@ -48,7 +72,7 @@ def create_phone_number_data(phone_string: str, phone_type: str = "Mobile", is_p
 
     # Clean the phone number
     phone_clean = str(phone_string).strip()
-    digits_only = re.sub(r'[^\d]', '', phone_clean)
+    digits_only = strip_non_digits(phone_clean)
 
     logger.info(f"Creating phoneNumberData from: '{phone_string}' -> digits: '{digits_only}'")
 
@@ -77,12 +101,18 @@ def create_phone_number_data(phone_string: str, phone_type: str = "Mobile", is_p
     logger.warning(f"Phone number too short: {len(digits_only)} digits")
     return []
 
-def test_phone_formats_with_crm(phone_string: str, contact_id: str, espocrm_url: str, headers: Dict[str, str]) -> Tuple[Optional[str], str]:
-    """Test different phone formats with actual CRM - prioritizes international format (+1XXXXXXXXXX)"""
+def test_phone_formats_with_crm(phone_string: str, contact_id: str, espocrm_url: str, headers: Dict[str, str],
+                                http=None) -> Tuple[Optional[str], str]:
+    """Test different phone formats with actual CRM - prioritizes international format (+1XXXXXXXXXX)
+
+    Pass the caller's requests.Session as http to reuse its pooled connections.
+    """
     if not phone_string or not contact_id:
         return None, "No phone or contact ID provided"
 
-    digits_only = re.sub(r'[^\d]', '', str(phone_string))
+    http = http or requests
+
+    digits_only = strip_non_digits(str(phone_string))
 
     # Handle 11-digit numbers starting with 1
     if len(digits_only) == 11 and digits_only.startswith('1'):
@@ -111,8 +141,8 @@ def test_phone_formats_with_crm(phone_string: str, contact_id: str, espocrm_url:
         }]
         test_update = {'phoneNumberData': phone_data}
 
-        response = requests.put(f"{espocrm_url}/Contact/{contact_id}",
-                              json=test_update, headers=headers, timeout=10)
+        response = http.put(f"{espocrm_url}/Contact/{contact_id}",
+                              data=_json.dumps(test_update), headers=headers, timeout=10)
 
         if response.status_code in [200, 204]:
             logger.info(f"SUCCESS! International format '{international_format}' worked with phoneNumberData!")
@@ -125,8 +155,8 @@ def test_phone_formats_with_crm(phone_string: str, contact_id: str, espocrm_url:
     # Fallback: Try simple phoneNumber field with international format
     try:
         test_update = {'phoneNumber': international_format}
-        response = requests.put(f"{espocrm_url}/Contact/{contact_id}",
-                              json=test_update, headers=headers, timeout=10)
+        response = http.put(f"{espocrm_url}/Contact/{contact_id}",
+                              data=_json.dumps(test_update), headers=headers, timeout=10)
 
         if response.status_code in [200, 204]:
             logger.info(f"SUCCESS! Simple phoneNumber field with '{international_format}' worked!")
@@ -147,8 +177,8 @@ def test_phone_formats_with_crm(phone_string: str, contact_id: str, espocrm_url:
             logger.info(f"Trying fallback format: '{test_format}'")
             test_update = {'phoneNumber': test_format}
 
-            response = requests.put(f"{espocrm_url}/Contact/{contact_id}",
-                                  json=test_update, headers=headers, timeout=10)
+            response = http.put(f"{espocrm_url}/Contact/{contact_id}",
+                                  data=_json.dumps(test_update), headers=headers, timeout=10)
 
             if response.status_code in [200, 204]:
                 logger.info(f"SUCCESS! Fallback format '{test_format}' worked!")
@@ -159,211 +189,39 @@ def test_phone_formats_with_crm(phone_string: str, contact_id: str, espocrm_url:
 
     return None, f"All phone formats failed for {phone_string}"
 
-# Input preprocessing
-def preprocess_input(user_input: str) -> Dict[str, Any]:
-    """
-    Extract structured data from natural language input
-    FIXED: Don't extract data from 'add' requests (let AI handle those)
-    """
-    user_input_lower = user_input.lower()
-    
-    # Skip preprocessing for explicit add requests - let AI handle them
-    add_keywords = [
-        'add this contact', 'add contact', 'create contact', 'new contact',
-        'add this person', 'create this contact', 'add new contact'
-    ]
-    
-    for keyword in add_keywords:
-        if keyword in user_input_lower:
-            logger.info(f"🔍 PREPROCESS: Detected '{keyword}' - skipping extraction, letting AI handle")
-            return {}  # Return empty dict, let AI function calling handle it
-    
-    logger.info(f"=== PREPROCESS_INPUT DEBUG ===")
-    logger.info(f"Input text: {user_input[:100]}...")
-    
-    updates = {}
-    
-    # Enhanced phone number patterns
-    phone_patterns = [
-        r'Phone\s+(\+?[\d\s\-\(\)\.]{10,})\s*\(Mobile\)',  # "Phone 612.875.4460 (Mobile)"
-        r'Mobile[:\s]+(\+?[\d\s\-\(\)\.]{10,})',           # "Mobile: 612.875.4460"
-        r'Phone[:\s]+(\+?[\d\s\-\(\)\.]{10,})',            # "Phone: 612.875.4460" 
-        r'(\+?1?\s*\(?[2-9]\d{2}\)?\s*[\.\-\s]?\d{3}[\.\-\s]?\d{4})'  # General phone pattern
-    ]
-    
-    for pattern in phone_patterns:
-        phone_match = re.search(pattern, user_input, re.IGNORECASE)
-        if phone_match:
-            phone_raw = phone_match.group(1)
-            formatted_phone = format_phone_for_crm(phone_raw)
-            if formatted_phone and len(re.sub(r'[^\d]', '', formatted_phone)) >= 10:
-                updates['phoneNumber'] = formatted_phone
-                updates['phoneNumberData'] = create_phone_number_data(formatted_phone, "Mobile", True)
-                logger.info(f"Extracted phone - will try both formats: simple='{formatted_phone}' and phoneNumberData structure")
-                break
-    
-    # Enhanced email patterns
-    email_patterns = [
-        r'Email\s+([\w\.-]+@[\w\.-]+\.\w+)',  # "Email tommoreimi@yahoo.com"
-        r'([\w\.-]+@[\w\.-]+\.\w+)',          # General email pattern
-    ]
-    
-    for pattern in email_patterns:
-        email_match = re.search(pattern, user_input, re.IGNORECASE)
-        if email_match:
-            updates['emailAddress'] = email_match.group(1).strip()
-            logger.info(f"Extracted email: {email_match.group(1).strip()}")
-            break
-    
-    # Extract LinkedIn URL
-    linkedin_match = re.search(r'linkedin\.com/in/([\w\-]+)', user_input, re.IGNORECASE)
-    if linkedin_match:
-        updates['cLinkedInURL'] = f"https://linkedin.com/in/{linkedin_match.group(1)}"
-        logger.info(f"Extracted LinkedIn: https://linkedin.com/in/{linkedin_match.group(1)}")
-    
-    # Extract title/position
-    title_patterns = [
-        r'Title[:\s]+(.*?)(?:\n|$)',
-        r'Position[:\s]+(.*?)(?:\n|$)',
-        r'Role[:\s]+(.*?)(?:\n|$)',
-        r'Job[:\s]+(.*?)(?:\n|$)'
-    ]
-    
-    for pattern in title_patterns:
-        title_match = re.search(pattern, user_input, re.IGNORECASE)
-        if title_match:
-            updates['cCurrentTitle'] = title_match.group(1).strip()
-            logger.info(f"Extracted title: {title_match.group(1).strip()}")
-            break
-    
-    # Extract address components
-    address_match = re.search(r'(\d+\s+[^,\n]+),?\s*([^,\n]+),?\s*([A-Z]{2})\s+(\d{5}(?:-\d{4})?)', user_input)
-    if address_match:
-        updates['addressStreet'] = address_match.group(1).strip()
-        updates['addressCity'] = address_match.group(2).strip()
-        updates['addressState'] = address_match.group(3).strip()
-        updates['addressPostalCode'] = address_match.group(4).strip()
-        updates['addressCountry'] = 'USA'
-        logger.info(f"Extracted full address components: {address_match.groups()}")
-    else:
-        # Try to extract city, state pattern
-        city_state_match = re.search(r'(?:address(?:\s+to)?|city)[:;\s]+([A-Za-z\s]+),\s*([A-Z]{2})\b', user_input, re.IGNORECASE)
-        if city_state_match:
-            updates['addressCity'] = city_state_match.group(1).strip()
-            updates['addressState'] = city_state_match.group(2).strip()
-            logger.info(f"Extracted city/state: {city_state_match.group(1).strip()}, {city_state_match.group(2).strip()}")
-    
-    # Extract skills
-    skills_patterns = [
-        r'Skills?[:\s]+([^\n\r]+)',
-        r'Technologies?[:\s]+([^\n\r]+)',
-        r'Expertise[:\s]+([^\n\r]+)'
-    ]
-    
-    for pattern in skills_patterns:
-        skills_match = re.search(pattern, user_input, re.IGNORECASE)
-        if skills_match:
-            updates['cSkills'] = skills_match.group(1).strip()
-            logger.info(f"Extracted skills: {skills_match.group(1).strip()}")
-            break
-    
-    logger.info(f"Final extracted updates: {updates}")
-    return updates
-
-def extract_contact_name_from_update(user_input: str) -> Optional[str]:
-    """
-    Extract explicit contact name from update requests
-    FIXED: Return None for explicit 'add' requests
-    """
-    user_input_lower = user_input.lower()
-    
-    # Don't extract names from add requests
-    add_keywords = [
-        'add this contact', 'add contact', 'create contact', 'new contact',
-        'add this person', 'create this contact', 'add new contact'
-    ]
-    
-    for keyword in add_keywords:
-        if keyword in user_input_lower:
-            logger.info(f"🔍 EXTRACT_NAME: Detected '{keyword}' - not extracting name from add request")
-            return None  # Don't extract name from add requests
-    
-    # Enhanced pronoun patterns
-    pronoun_patterns = [
-        r'update\s+(?:his|her|their|this)\s+(?:contact|phone|email|linkedin|url|address)',
-        r'update\s+(?:him|her|them|this)',
-        r'(?:his|her|their)\s+(?:phone|email|contact|linkedin|url|address)',
-        r'^(?:his|her|their)\s+(?:phone|email|linkedin|url|address)',
-        r'update\s+(?:his|her|their)\s+\w+',
-        r'^(?:his|her|their)\s+\w+:',
-    ]
-    
-    for pattern in pronoun_patterns:
-        if re.search(pattern, user_input, re.IGNORECASE):
-            logger.info("Detected pronoun reference - using current context")
-            return "USE_CONTEXT"
-    
-    # Look for explicit names
-    name_patterns = [
-        r'update\s+(?:contact\s+)?([A-Za-z\s]+?):\s*',
-        r'update\s+([A-Za-z\s]+?)\s*(?:with|to|phone|email|Profile)',
-        r'Update\s+([A-Za-z\s]+?):\s*',
-        r"([A-Za-z\s]+)'s\s+(?:phone|email|linkedin|address|contact)",
-        r'([A-Za-z\s]+)\s+(?:phone|email|linkedin|address):',
-    ]
-    
-    for pattern in name_patterns:
-        match = re.search(pattern, user_input, re.IGNORECASE)
-        if match:
-            name = match.group(1).strip()
-            if name.lower() not in ['contact', 'the', 'this', 'his', 'her', 'their', 'info', 'profile', 'update']:
-                logger.info(f"Extracted explicit contact name: {name}")
-                return name
-    
+# "123 Main St, Springfield, IL 62704". The street/city runs are bounded -
+# unbounded they backtrack cubically on long comma-free text (a flattened
+# resume could take minutes) - and the pattern is only tried in a window just
+# before each "ST 12345" anchor, which every match has to end with.
+_ADDRESS_PATTERN = re.compile(r'(\d+\s+[^,\n]{1,80}),?\s*([^,\n]{1,50}),?\s*([A-Z]{2})\s+(\d{5}(?:-\d{4})?)')
+_STATE_ZIP_PATTERN = re.compile(r'[A-Z]{2}\s+\d{5}')
+ADDRESS_MAX_SPAN = 200
+
+def search_address(text: str) -> Optional[re.Match]:
+    """Find a street, city, state and ZIP address in text"""
+    for anchor in _STATE_ZIP_PATTERN.finditer(text):
+        address_match = _ADDRESS_PATTERN.search(text, max(0, anchor.start() - ADDRESS_MAX_SPAN), anchor.end() + 5)
+        if address_match:
+            return address_match
     return None
 
-def is_update_intent(user_input: str) -> bool:
-    """
-    Check if user input indicates update intent
-    FIXED: Never return True for explicit 'add' requests
-    """
-    user_input_lower = user_input.lower()
-    
-    # CRITICAL: If user explicitly wants to add/create, this is NOT an update
-    add_keywords = [
-        'add this contact', 'add contact', 'create contact', 'new contact',
-        'add this person', 'create this contact', 'add new contact',
-        'add:', 'create:', 'new:'
-    ]
-    
-    for keyword in add_keywords:
-        if keyword in user_input_lower:
-            logger.info(f"🔍 UPDATE_INTENT: Detected '{keyword}' - this is NOT an update")
-            return False  # Explicitly NOT an update
-    
-    # Look for update indicators
-    update_keywords = ['update', 'change', 'set', 'add phone', 'add email', 'phone is', 'email is', 'linkedin', 'skills', 'title', 'address', 'street', 'city', 'state', 'zip']
-    result = any(keyword in user_input_lower for keyword in update_keywords)
-    
-    if result:
-        logger.info(f"🔍 UPDATE_INTENT: Detected update intent - returning True")
-    else:
-        logger.info(f"🔍 UPDATE_INTENT: No update intent detected - returning False")
-    
-    return result
-
 # Session management
 def set_last_contact(contact_id: str, name: str):
     """Set the last contact in session"""
-    session['last_contact'] = {
+    session['last_contact'] = g.last_contact = {
         'id': contact_id,
         'name': name,
         'timestamp': time.time()
     }
-    session.modified = True
     logger.info(f"Set last contact to: {name} (ID: {contact_id})")
 
 def get_last_contact() -> Optional[Dict[str, Any]]:
+    """Get the last contact, reading and expiry-checking the session once per request"""
+    if 'last_contact' not in g:
+        g.last_contact = _load_last_contact()
+    return g.last_contact
+
+def _load_last_contact() -> Optional[Dict[str, Any]]:
     """Get the last contact from session"""
     last_contact = session.get('last_contact')
     if not last_contact:
@@ -372,21 +230,50 @@ def get_last_contact() -> Optional[Dict[str, Any]]:
     # Clear if older than 30 minutes
     if time.time() - last_contact.get('timestamp', 0) > 1800:
         session['last_contact'] = None
-        session.modified = True
         return None
     
     return last_contact
 
+def load_history() -> deque:
+    """Decode the conversation history from the session into a bounded deque"""
+    raw = session.get(HISTORY_SESSION_KEY)
+    if raw:
+        try:
+            return deque(_json.loads(raw), maxlen=MAX_HISTORY)
+        except ValueError as e:
+            logger.warning(f"⚠️ Discarding unreadable conversation history: {e}")
+            return deque(maxlen=MAX_HISTORY)
+
+    # Sessions created before the serialized format still carry a plain list
+    return deque(session.pop('conversation_history', None) or [], maxlen=MAX_HISTORY)
+
+def push_history(history, user_content: str, assistant_content: str) -> None:
+    """Append a user/assistant exchange to the history in one step, skipping
+    an exact repeat of the previous exchange (retries, double submits)"""
+    exchange = (
+        {"role": "user", "content": user_content},
+        {"role": "assistant", "content": assistant_content}
+    )
+    if len(history) >= 2 and history[-2] == exchange[0] and history[-1] == exchange[1]:
+        return
+    history.extend(exchange)
+
+def save_history(history) -> None:
+    """Serialize the conversation history back into the session"""
+    raw = _json.dumps(list(history))
+    # Assigning marks the session modified (a store write plus a fresh
+    # cookie), so leave it alone when nothing was added this request
+    if session.get(HISTORY_SESSION_KEY) != raw:
+        session[HISTORY_SESSION_KEY] = raw
+
 def init_session() -> bool:
     """Initialize session"""
     try:
-        session.permanent = True
-        if 'conversation_history' not in session:
-            session['conversation_history'] = []
+        # Assigning permanent marks the session modified, so only do it once
+        if not session.permanent:
+            session.permanent = True
         if 'last_contact' not in session:
             session['last_contact'] = None
-        session['session_test'] = f"Active at {time.time()}"
-        session.modified = True
         return True
     except Exception as e:
         logger.error(f"Session init failed: {e}")